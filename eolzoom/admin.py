@@ -3,9 +3,12 @@
 
 from django.contrib import admin
 
-from .models import EolZoomAuth, EolZoomRegistrant, EolGoogleAuth, EolZoomMappingUserMeet
+from .models import EolZoomAuth, EolZoomRegistrant, EolGoogleAuth, EolZoomMappingUserMeet, EolZoomEventInbox, EolZoomBroadcast, EolZoomParticipant
 
 admin.site.register(EolZoomAuth)
 admin.site.register(EolGoogleAuth)
 admin.site.register(EolZoomMappingUserMeet)
 admin.site.register(EolZoomRegistrant)
+admin.site.register(EolZoomEventInbox)
+admin.site.register(EolZoomBroadcast)
+admin.site.register(EolZoomParticipant)
@@ -33,4 +33,4 @@ class EolZoomConfig(AppConfig):
         }}
 
     def ready(self):
-        pass
+        from . import signals  # pylint: disable=unused-import
@@ -0,0 +1,138 @@
+# -*- coding: utf-8 -*-
+"""
+    Asyncio engine to register students in a meeting
+    ('asyncio' register_mode of EOL_ZOOM_REGISTER_MEETING_USERS task)
+"""
+
+
+from django.conf import settings
+
+from .rate_limit import wait_for_quota, get_retry_delay, block
+from .views import MAX_REGISTRANT_STATUS, _chunks, get_registrant_info, get_registrant_platform_name
+import asyncio
+import json
+
+import logging
+logger = logging.getLogger(__name__)
+
+
+def register_students(user_meeting, meeting_id, students, access_token, progress):
+    """
+        Register and approve students with an async HTTP client.
+        Students (can be an iterator) are consumed by batches of 'concurrency' chunks.
+        progress(students_count, registered) is called for each chunk when its batch ends
+    """
+    platform_name = get_registrant_platform_name()
+    batch_size = MAX_REGISTRANT_STATUS * settings.EOLZOOM_REGISTRANT_ASYNC_CONCURRENCY
+    for students_batch in _chunks(students, batch_size):
+        # Database access (students info and task progress) is done out of the event loop
+        students_info = [get_registrant_info(student, platform_name) for student in students_batch]
+        results = []
+        asyncio.run(_register_students(user_meeting.id, meeting_id, students_info, access_token, results))
+        for students_count, registered in results:
+            progress(students_count, registered)
+
+
+async def _register_students(account, meeting_id, students_info, access_token, results):
+    """
+        Open the async session and register all the chunks
+    """
+    import aiohttp
+    concurrency = settings.EOLZOOM_REGISTRANT_ASYNC_CONCURRENCY
+    connect_timeout, read_timeout = settings.EOLZOOM_HTTP_TIMEOUT
+    headers = {
+        "Authorization": "Bearer {}".format(access_token),
+        "Content-Type": "application/json"
+    }
+    async with aiohttp.ClientSession(
+            headers=headers,
+            connector=aiohttp.TCPConnector(limit=concurrency),
+            timeout=aiohttp.ClientTimeout(sock_connect=connect_timeout, sock_read=read_timeout)) as session:
+        await register_chunks(session, account, meeting_id, students_info, results, concurrency)
+
+
+async def register_chunks(session, account, meeting_id, students_info, results, concurrency):
+    """
+        Register chunks of MAX_REGISTRANT_STATUS students concurrently
+        (max 'concurrency' requests in flight).
+        (students_count, registered) of each chunk is added to results.
+        A failed chunk is reported as failed, the other chunks are registered
+    """
+    semaphore = asyncio.Semaphore(concurrency)
+    chunks = [
+        students_info[i:i + MAX_REGISTRANT_STATUS]
+        for i in range(0, len(students_info), MAX_REGISTRANT_STATUS)]
+    errors = await asyncio.gather(*[
+        _register_chunk(session, semaphore, account, meeting_id, chunk, results)
+        for chunk in chunks], return_exceptions=True)
+    for chunk, error in zip(chunks, errors):
+        if isinstance(error, Exception):
+            logger.error("Error Meeting Registrant, meeting_id: {}, exception: {}".format(meeting_id, str(error)))
+            results.append((len(chunk), False))
+
+
+async def _register_chunk(session, semaphore, account, meeting_id, students_info, results):
+    """
+        Create meeting registrant for a set of students and approve it.
+        Students whose registration fails are reported as failed
+    """
+    url = "https://api.zoom.us/v2/meetings/{}/registrants".format(meeting_id)
+    responses = await asyncio.gather(*[
+        _zoom_request(session, semaphore, 'POST', url, account, data=json.dumps(student_info))
+        for student_info in students_info])
+    students_registrant = []
+    for student_info, (status, data) in zip(students_info, responses):
+        if status == 201 and 'registrant_id' in data:
+            students_registrant.append({
+                'id': data['registrant_id'],
+                'email': student_info['email']
+            })
+        else:
+            logger.error('{} Registration fail {}'.format(status, data))
+    failed = len(students_info) - len(students_registrant)
+    if failed:
+        results.append((failed, False))
+    if not students_registrant:
+        return
+    body = {
+        'action': 'approve',
+        'registrants': students_registrant
+    }
+    url = "https://api.zoom.us/v2/meetings/{}/registrants/status".format(meeting_id)
+    status, data = await _zoom_request(session, semaphore, 'PUT', url, account, data=json.dumps(body))
+    if status != 204:
+        logger.error('Set registrant status fail {}'.format(status))
+    results.append((len(students_registrant), status == 204))
+
+
+async def _zoom_request(session, semaphore, method, url, account, **kwargs):
+    """
+        Send a registrant request through the rate governor (retry 429 responses)
+        Return status and json (or text) response, status None if the request fails
+    """
+    import aiohttp
+    loop = asyncio.get_running_loop()
+    max_retries = settings.EOLZOOM_RATE_LIMIT_MAX_RETRIES
+    for attempt in range(max_retries + 1):
+        # rate governor waits are blocking, run them out of the event loop
+        await loop.run_in_executor(None, wait_for_quota, 'registrants', account)
+        async with semaphore:
+            try:
+                async with session.request(method, url, **kwargs) as r:
+                    if r.status != 429:
+                        if r.content_type == 'application/json':
+                            return r.status, await r.json()
+                        return r.status, await r.text()
+                    delay = get_retry_delay(r, attempt)
+            except (aiohttp.ClientError, asyncio.TimeoutError, ValueError) as e:
+                logger.error("Zoom request error, url: {}, account: {}, exception: {}".format(url, account, repr(e)))
+                return None, {}
+        if delay is None or attempt == max_retries:
+            logger.error("Zoom rate limit exceeded, url: {}, account: {}".format(url, account))
+            return r.status, {}
+        logger.warning(
+            "Zoom rate limit reached, url: {}, account: {}. Retry ({}) in {:.2f}s".format(
+                url, account, attempt + 1, delay))
+        block('registrants', account, delay)
+        await asyncio.sleep(delay)
+    return r.status, {}
@@ -1,12 +1,13 @@
 
 from openedx.core.djangoapps.site_configuration import helpers as configuration_helpers
 from django.conf import settings
+from django.core.cache import cache
 from cms.djangoapps.contentstore.utils import get_lms_link_for_item
 from lms.djangoapps.courseware.courses import get_course_by_id
 from opaque_keys.edx.keys import UsageKey
 
 from celery import task
-from django.core.mail import send_mail
+from django.core.mail import EmailMultiAlternatives, get_connection, send_mail
 from django.utils.html import strip_tags
 
 from django.template.loader import render_to_string
@@ -16,14 +17,69 @@ logger = logging.getLogger(__name__)
 
 EMAIL_DEFAULT_RETRY_DELAY = 30
 EMAIL_MAX_RETRIES = 5
+MEETING_START_MESSAGE_CACHE_KEY = 'eolzoom:meeting_start_message:{}'
 
 @task(
-    queue='edx.lms.core.high',
+    queue=settings.EOLZOOM_EMAIL_QUEUE,
+    rate_limit=settings.EOLZOOM_EMAIL_RATE_LIMIT,
     default_retry_delay=EMAIL_DEFAULT_RETRY_DELAY,
     max_retries=EMAIL_MAX_RETRIES)
 def meeting_start_email(block_id, user_email):
     """
         Send mail to specific user at meeting start
+        Deprecated: not called anymore (see meeting_start_emails), kept only so the
+        messages already queued can still drain during deploy. Remove in next release.
+    """
+    subject, plain_message, html_message, from_email = get_meeting_start_message(block_id)
+    mail = send_mail(
+        subject,
+        plain_message,
+        from_email,
+        [user_email],
+        fail_silently=False,
+        html_message=html_message)
+    return mail
+
+
+@task(
+    queue=settings.EOLZOOM_EMAIL_QUEUE,
+    rate_limit=settings.EOLZOOM_EMAIL_RATE_LIMIT,
+    default_retry_delay=EMAIL_DEFAULT_RETRY_DELAY,
+    max_retries=EMAIL_MAX_RETRIES)
+def meeting_start_emails(block_id, user_emails):
+    """
+        Send mail to a chunk of users at meeting start (one message rendering, one connection)
+    """
+    subject, plain_message, html_message, from_email = get_meeting_start_message(block_id)
+    messages = []
+    for user_email in user_emails:
+        message = EmailMultiAlternatives(
+            subject,
+            plain_message,
+            from_email,
+            [user_email])
+        message.attach_alternative(html_message, 'text/html')
+        messages.append(message)
+    connection = get_connection(fail_silently=False)
+    return connection.send_messages(messages)
+
+
+def get_meeting_start_message(block_id):
+    """
+        Get subject, plain message, html message and from email of the meeting start mail
+        (cached by block id, is the same for all the recipients)
+    """
+    cache_key = MEETING_START_MESSAGE_CACHE_KEY.format(block_id)
+    message = cache.get(cache_key)
+    if message is None:
+        message = _build_meeting_start_message(block_id)
+        cache.set(cache_key, message, settings.EOLZOOM_EMAIL_CONTEXT_CACHE_TIMEOUT)
+    return message
+
+
+def _build_meeting_start_message(block_id):
+    """
+        Render the meeting start mail of the block
     """
     platform_name = configuration_helpers.get_value(
             'PLATFORM_NAME', settings.PLATFORM_NAME)
@@ -43,11 +99,4 @@ def meeting_start_email(block_id, user_email):
         'email_from_address',
         settings.BULK_EMAIL_DEFAULT_FROM_EMAIL
     )
-    mail = send_mail(
-        subject,
-        plain_message,
-        from_email,
-        [user_email],
-        fail_silently=False,
-        html_message=html_message)
-    return mail
+    return subject, plain_message, html_message, from_email
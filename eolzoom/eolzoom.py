@@ -1,8 +1,9 @@
 import pkg_resources
 
 from django.template import Context, Template
-from django.urls import reverse
+from django.urls import get_script_prefix, reverse
 from django.conf import settings as DJANGO_SETTINGS
+from django.core.cache import cache
 
 from webob import Response
 
@@ -10,8 +11,10 @@ from webob import Response
 import logging
 logger = logging.getLogger(__name__)
 
+import hashlib
 import requests
 import json
+from functools import lru_cache
 from six import text_type
 
 from xblock.core import XBlock
@@ -25,6 +28,59 @@ from openedx.core.djangoapps.theming.helpers import get_current_request
 def _(text): return text
 
 
+try:
+    PACKAGE_VERSION = pkg_resources.get_distribution('eolzoom-xblock').version
+except pkg_resources.DistributionNotFound:
+    PACKAGE_VERSION = ''
+
+STUDENTS_COUNT_CACHE_KEY = 'eolzoom:students_count:{}'
+
+# Process-level caches of decoded resources and compiled templates, keyed by (package version, path)
+_resources_cache = {}
+_templates_cache = {}
+_hashes_cache = {}
+
+
+@lru_cache(maxsize=None)
+def _get_url_bundle(script_prefix, eolzoom_domain, eolzoom_client_id):
+    """
+        Urls used by all the blocks (computed once per process)
+    """
+    return {
+        'url_start_meeting': reverse('start_meeting'),
+        'get_student_join_url': reverse('get_student_join_url'),
+        'wait_student_join_url': reverse('wait_student_join_url'),
+        'url_google_auth': reverse('auth_google'),
+        'url_is_logged_google': reverse('google_is_logged'),
+        'url_youtube_validate': reverse('youtube_validate'),
+        'url_is_logged_zoom': reverse('is_logged_zoom'),
+        'url_login': reverse('zoom_api'),
+        'url_zoom_api': '{}oauth/authorize?response_type=code&client_id={}&redirect_uri='.format(
+            eolzoom_domain,
+            eolzoom_client_id),
+        'url_new_meeting': reverse('new_scheduled_meeting'),
+        'url_new_livebroadcast': reverse('url_new_livebroadcast'),
+        'url_update_livebroadcast': reverse('url_update_livebroadcast'),
+        'url_update_meeting': reverse('update_scheduled_meeting'),
+    }
+
+
+@lru_cache(maxsize=4096)
+def _get_start_public_meeting_url(script_prefix, email_notification, meeting_id, block_id, restricted_access):
+    """
+        Start public meeting url of a block (computed once per block configuration)
+    """
+    return reverse(
+        'start_public_meeting',
+        kwargs={
+            'email_notification': email_notification,
+            'meeting_id': meeting_id,
+            'block_id': block_id,
+            'restricted_access': restricted_access
+        }
+    )
+
+
 class EolZoomXBlock(XBlock):
 
     display_name = String(
@@ -125,40 +181,51 @@ class EolZoomXBlock(XBlock):
     )
 
     has_author_view = True
+    # Files served by the runtime (local_resource_url), templates in static/ are not exposed
+    public_dir = 'public'
 
     def resource_string(self, path):
-        """Handy helper for getting resources from our kit."""
-        data = pkg_resources.resource_string(__name__, path)
-        return data.decode("utf8")
+        """Handy helper for getting resources from our kit (loaded once per process)."""
+        key = (PACKAGE_VERSION, path)
+        data = _resources_cache.get(key)
+        if data is None:
+            data = pkg_resources.resource_string(__name__, path).decode("utf8")
+            _resources_cache[key] = data
+        return data
+
+    def static_url(self, path):
+        """
+            Url of a static file served by the runtime, versioned with a hash of its content
+        """
+        key = (PACKAGE_VERSION, path)
+        digest = _hashes_cache.get(key)
+        if digest is None:
+            digest = hashlib.md5(self.resource_string(path).encode('utf8')).hexdigest()[:12]
+            _hashes_cache[key] = digest
+        return '{}?v={}'.format(self.runtime.local_resource_url(self, path), digest)
 
     def student_view(self, context=None):
         context_html = self.get_context(is_lms=True)
         template = self.render_template(
             'static/html/eolzoom.html', context_html)
         frag = Fragment(template)
-        frag.add_css(self.resource_string("static/css/eolzoom.css"))
-        frag.add_javascript(self.resource_string("static/js/src/eolzoom.js"))
+        # Same urls in all the blocks of the page, css and js are loaded (and cached by the browser) once
+        frag.add_css_url(self.static_url("public/css/eolzoom.css"))
+        frag.add_javascript_url(self.static_url("public/js/src/eolzoom.js"))
+        urls = self.get_urls()
         settings = {
             'meeting_id': self.meeting_id,
             'block_id': self.location,
             'course_id': text_type(
                 self.xmodule_runtime.course_id),
             'email_notification' : self.email_notification,
-            'url_start_public_meeting':reverse(
-                'start_public_meeting',
-                    kwargs={
-                        'email_notification':self.email_notification,
-                        'meeting_id': self.meeting_id,
-                        'block_id': self.location,
-                        'restricted_access': self.restricted_access
-                    }
-            ),
-            'url_start_meeting': reverse('start_meeting'),
-            'get_student_join_url': reverse('get_student_join_url'),
+            'url_start_public_meeting': urls['url_start_public_meeting'],
+            'url_start_meeting': urls['url_start_meeting'],
+            'get_student_join_url': urls['get_student_join_url'],
+            'wait_student_join_url': urls['wait_student_join_url'],
+            'join_url_wait_timeout': DJANGO_SETTINGS.EOLZOOM_JOIN_URL_WAIT_TIMEOUT,
             'restricted_access': self.restricted_access,
-            'url_zoom_api': '{}oauth/authorize?response_type=code&client_id={}&redirect_uri='.format(
-                DJANGO_SETTINGS.EOLZOOM_DOMAIN,
-                DJANGO_SETTINGS.EOLZOOM_CLIENT_ID),
+            'url_zoom_api': urls['url_zoom_api'],
         }
         frag.initialize_js('EolZoomXBlock', json_args=settings)
         return frag
@@ -170,10 +237,11 @@ class EolZoomXBlock(XBlock):
         template = self.render_template(
             'static/html/studio.html', context_html)
         frag = Fragment(template)
-        frag.add_css(self.resource_string("static/css/eolzoom.css"))
+        frag.add_css(self.resource_string("public/css/eolzoom.css"))
         frag.add_javascript(self.resource_string("static/js/src/studio.js"))
         enrolled_students = self.get_students_count(
             text_type(self.scope_ids.usage_id.course_key))
+        urls = self.get_urls()
 
         settings = {
             'meeting_id': self.meeting_id,
@@ -187,19 +255,17 @@ class EolZoomXBlock(XBlock):
             'join_url': self.join_url,
             'restricted_access': self.restricted_access,
             'google_access': self.google_access,
-            'url_google_auth': reverse('auth_google'),
-            'url_is_logged_google': reverse('google_is_logged'),
-            'url_youtube_validate': reverse('youtube_validate'),
+            'url_google_auth': urls['url_google_auth'],
+            'url_is_logged_google': urls['url_is_logged_google'],
+            'url_youtube_validate': urls['url_youtube_validate'],
             'broadcast_id': self.broadcast_id,
-            'url_is_logged_zoom': reverse('is_logged_zoom'),
-            'url_login': reverse('zoom_api'),
-            'url_zoom_api': '{}oauth/authorize?response_type=code&client_id={}&redirect_uri='.format(
-                DJANGO_SETTINGS.EOLZOOM_DOMAIN,
-                DJANGO_SETTINGS.EOLZOOM_CLIENT_ID),
-            'url_new_meeting': reverse('new_scheduled_meeting'),
-            'url_new_livebroadcast': reverse('url_new_livebroadcast'),
-            'url_update_livebroadcast': reverse('url_update_livebroadcast'),
-            'url_update_meeting': reverse('update_scheduled_meeting'),
+            'url_is_logged_zoom': urls['url_is_logged_zoom'],
+            'url_login': urls['url_login'],
+            'url_zoom_api': urls['url_zoom_api'],
+            'url_new_meeting': urls['url_new_meeting'],
+            'url_new_livebroadcast': urls['url_new_livebroadcast'],
+            'url_update_livebroadcast': urls['url_update_livebroadcast'],
+            'url_update_meeting': urls['url_update_meeting'],
         }
         frag.initialize_js('EolZoomStudioXBlock', json_args=settings)
         return frag 
@@ -213,8 +279,9 @@ class EolZoomXBlock(XBlock):
         template = self.render_template(
             'static/html/author_view.html', context_html)
         frag = Fragment(template)
-        frag.add_css(self.resource_string("static/css/eolzoom.css"))
+        frag.add_css(self.resource_string("public/css/eolzoom.css"))
         frag.add_javascript(self.resource_string("static/js/src/author.js"))
+        urls = self.get_urls()
 
         settings = {
             'meeting_id': self.meeting_id,
@@ -222,48 +289,55 @@ class EolZoomXBlock(XBlock):
             'course_id': text_type(
                 self.xmodule_runtime.course_id),
             'email_notification': self.email_notification,
-            'url_start_public_meeting':reverse(
-                'start_public_meeting',
-                    kwargs={
-                        'email_notification':self.email_notification,
-                        'meeting_id': self.meeting_id,
-                        'block_id': self.location,
-                        'restricted_access': self.restricted_access
-                    }
-            ),
-            'url_start_meeting': reverse('start_meeting'),
-            'get_student_join_url': reverse('get_student_join_url'),
+            'url_start_public_meeting': urls['url_start_public_meeting'],
+            'url_start_meeting': urls['url_start_meeting'],
+            'get_student_join_url': urls['get_student_join_url'],
             'restricted_access': self.restricted_access,
-            'url_zoom_api': '{}oauth/authorize?response_type=code&client_id={}&redirect_uri='.format(
-                DJANGO_SETTINGS.EOLZOOM_DOMAIN,
-                DJANGO_SETTINGS.EOLZOOM_CLIENT_ID),
+            'url_zoom_api': urls['url_zoom_api'],
         }
         frag.initialize_js('EolZoomAuthorXBlock', json_args=settings)
         return frag
 
+    def get_urls(self):
+        """
+            Urls of the block (memoized by settings and block configuration)
+        """
+        script_prefix = get_script_prefix()
+        urls = dict(_get_url_bundle(
+            script_prefix,
+            DJANGO_SETTINGS.EOLZOOM_DOMAIN,
+            DJANGO_SETTINGS.EOLZOOM_CLIENT_ID))
+        urls['url_start_public_meeting'] = _get_start_public_meeting_url(
+            script_prefix,
+            self.email_notification,
+            self.meeting_id,
+            text_type(self.location),
+            self.restricted_access)
+        return urls
+
     def get_students_count(self, course_id):
         """
         Get a count of all students enrolled to course
+        (cached, removed from cache by enrollment changes)
         """
         from common.djangoapps.student.models import CourseEnrollment
-        course_key = CourseKey.from_string(course_id)
-        students = CourseEnrollment.objects.filter(
-            course_id=course_key,
-            is_active=1
-        ).count()
+        cache_key = STUDENTS_COUNT_CACHE_KEY.format(course_id)
+        students = cache.get(cache_key)
+        if students is None:
+            course_key = CourseKey.from_string(course_id)
+            students = CourseEnrollment.objects.filter(
+                course_id=course_key,
+                is_active=1
+            ).count()
+            cache.set(cache_key, students, DJANGO_SETTINGS.EOLZOOM_STUDENTS_COUNT_CACHE_TIMEOUT)
         return students
     
     def get_broadcast_id(self):
-        from .models import EolZoomMappingUserMeet
-        try:
-            user_model = EolZoomMappingUserMeet.objects.get(meeting_id=self.meeting_id)
-            if user_model.broadcast_ids == "":
-                return []
-            broadcast_ids = user_model.broadcast_ids.split(" ")
-            complete_url = ["https://youtu.be/{}".format(x) for x in broadcast_ids]
-            return complete_url
-        except EolZoomMappingUserMeet.DoesNotExist:
-            return []
+        from .models import EolZoomBroadcast
+        broadcast_ids = EolZoomBroadcast.objects.filter(
+            meeting__meeting_id=self.meeting_id).order_by(
+                'created', 'id').values_list('broadcast_id', flat=True)
+        return ["https://youtu.be/{}".format(x) for x in broadcast_ids]
 
     def get_context(self, is_lms=False):
         # Status: false (at least one attribute is empty), true (all attributes
@@ -275,7 +349,7 @@ class EolZoomXBlock(XBlock):
             'EOLZOOM_DOMAIN': DJANGO_SETTINGS.EOLZOOM_DOMAIN,
             'zoom_logo_path': self.runtime.local_resource_url(
                 self,
-                "static/images/ZoomLogo.png"),
+                "public/images/ZoomLogo.png"),
             'status': status,
             'is_course_staff': getattr(
                 self.xmodule_runtime,
@@ -284,8 +358,11 @@ class EolZoomXBlock(XBlock):
         }
 
     def render_template(self, template_path, context):
-        template_str = self.resource_string(template_path)
-        template = Template(template_str)
+        key = (PACKAGE_VERSION, template_path)
+        template = _templates_cache.get(key)
+        if template is None:
+            template = Template(self.resource_string(template_path))
+            _templates_cache[key] = template
         return template.render(Context(context))
 
     @XBlock.handler
@@ -0,0 +1,67 @@
+# -*- coding: utf-8 -*-
+"""
+    Process-wide HTTP client used by every Zoom and Google API call.
+    Connections are pooled (keep-alive) per host and every request has a timeout.
+"""
+
+
+from django.conf import settings
+
+import requests
+from requests.adapters import HTTPAdapter
+import threading
+
+import logging
+logger = logging.getLogger(__name__)
+
+_session = None
+_session_lock = threading.Lock()
+
+
+def get_session():
+    """
+        Return the process session, created on first use
+        (after fork, so each Celery/uWSGI worker has its own pool)
+    """
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                _session = _create_session()
+    return _session
+
+
+def _create_session():
+    """
+        Create a session with a connection pool for each configured host
+    """
+    session = requests.Session()
+    for prefix, pool_size in settings.EOLZOOM_HTTP_POOL_SIZES.items():
+        session.mount(
+            prefix,
+            HTTPAdapter(pool_connections=1, pool_maxsize=pool_size))
+    return session
+
+
+def request(method, url, **kwargs):
+    """
+        Send a request through the shared session (default timeout from settings)
+    """
+    kwargs.setdefault('timeout', settings.EOLZOOM_HTTP_TIMEOUT)
+    return get_session().request(method, url, **kwargs)
+
+
+def get(url, **kwargs):
+    return request('GET', url, **kwargs)
+
+
+def post(url, **kwargs):
+    return request('POST', url, **kwargs)
+
+
+def patch(url, **kwargs):
+    return request('PATCH', url, **kwargs)
+
+
+def put(url, **kwargs):
+    return request('PUT', url, **kwargs)
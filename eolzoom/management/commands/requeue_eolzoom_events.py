@@ -0,0 +1,22 @@
+# -*- coding: utf-8 -*-
+"""
+    Queue again the Zoom events of EolZoomEventInbox lost (pending) or failed,
+    and delete the old events (EOLZOOM_EVENT_RETENTION).
+    Run it periodically (cron), e.g.:
+        python manage.py lms requeue_eolzoom_events
+"""
+
+
+from django.core.management.base import BaseCommand
+
+from eolzoom.views import purge_event_inbox, requeue_event_inbox
+
+
+class Command(BaseCommand):
+    help = 'Queue again stale pending and failed Zoom events and delete old events'
+
+    def handle(self, *args, **options):
+        count = requeue_event_inbox()
+        self.stdout.write('Requeued events: {}'.format(count))
+        count = purge_event_inbox()
+        self.stdout.write('Deleted events: {}'.format(count))
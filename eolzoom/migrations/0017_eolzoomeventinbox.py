@@ -0,0 +1,27 @@
+# Generated by Django 2.2.24 on 2026-10-18 12:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('eolzoom', '0016_auto_20210504_1416'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='EolZoomEventInbox',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('event', models.CharField(max_length=100)),
+                ('meeting_id', models.CharField(db_index=True, max_length=50)),
+                ('payload', models.TextField()),
+                ('status', models.CharField(choices=[('pending', 'Pending'), ('processed', 'Processed'), ('failed', 'Failed')], db_index=True, default='pending', max_length=20)),
+                ('remote_addr', models.CharField(default='', max_length=100)),
+                ('server_name', models.CharField(default='', max_length=255)),
+                ('created', models.DateTimeField(auto_now_add=True)),
+                ('processed_at', models.DateTimeField(blank=True, null=True)),
+            ],
+        ),
+    ]
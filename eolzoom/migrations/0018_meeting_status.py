@@ -0,0 +1,43 @@
+# Generated by Django 2.2.24 on 2026-10-18 12:30
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('eolzoom', '0017_eolzoomeventinbox'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='eolzoommappingusermeet',
+            name='is_live',
+            field=models.BooleanField(default=False),
+        ),
+        migrations.AddField(
+            model_name='eolzoommappingusermeet',
+            name='started_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='eolzoommappingusermeet',
+            name='ended_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='eolzoommappingusermeet',
+            name='participants_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='eolzoommappingusermeet',
+            name='attendance_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='eolzoommappingusermeet',
+            name='recording_url',
+            field=models.TextField(blank=True, default=''),
+        ),
+    ]
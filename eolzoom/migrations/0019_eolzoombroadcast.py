@@ -0,0 +1,57 @@
+# Generated by Django 2.2.24 on 2026-10-18 13:00
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def broadcast_ids_to_broadcasts(apps, schema_editor):
+    """
+        Create a EolZoomBroadcast for each id in broadcast_ids (same order)
+    """
+    EolZoomMappingUserMeet = apps.get_model('eolzoom', 'EolZoomMappingUserMeet')
+    EolZoomBroadcast = apps.get_model('eolzoom', 'EolZoomBroadcast')
+    for user_model in EolZoomMappingUserMeet.objects.exclude(broadcast_ids="").iterator():
+        broadcast_ids = []
+        for broadcast_id in user_model.broadcast_ids.split(" "):
+            if broadcast_id != "" and broadcast_id not in broadcast_ids:
+                broadcast_ids.append(broadcast_id)
+        for broadcast_id in broadcast_ids:
+            EolZoomBroadcast.objects.create(meeting=user_model, broadcast_id=broadcast_id)
+
+
+def broadcasts_to_broadcast_ids(apps, schema_editor):
+    """
+        Join the meeting broadcasts in broadcast_ids
+    """
+    EolZoomMappingUserMeet = apps.get_model('eolzoom', 'EolZoomMappingUserMeet')
+    EolZoomBroadcast = apps.get_model('eolzoom', 'EolZoomBroadcast')
+    for user_model in EolZoomMappingUserMeet.objects.iterator():
+        broadcast_ids = EolZoomBroadcast.objects.filter(
+            meeting=user_model).order_by('created', 'id').values_list('broadcast_id', flat=True)
+        user_model.broadcast_ids = " ".join(broadcast_ids)[:255]
+        user_model.save()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('eolzoom', '0018_meeting_status'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='EolZoomBroadcast',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('broadcast_id', models.CharField(max_length=50)),
+                ('created', models.DateTimeField(auto_now_add=True)),
+                ('status', models.CharField(default='created', max_length=30)),
+                ('meeting', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='broadcasts', to='eolzoom.EolZoomMappingUserMeet')),
+            ],
+            options={
+                'unique_together': {('meeting', 'broadcast_id')},
+                'index_together': {('meeting', 'created')},
+            },
+        ),
+        migrations.RunPython(broadcast_ids_to_broadcasts, broadcasts_to_broadcast_ids),
+    ]
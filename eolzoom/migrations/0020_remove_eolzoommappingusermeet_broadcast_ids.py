@@ -0,0 +1,17 @@
+# Generated by Django 2.2.24 on 2026-10-18 13:00
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('eolzoom', '0019_eolzoombroadcast'),
+    ]
+
+    operations = [
+        migrations.RemoveField(
+            model_name='eolzoommappingusermeet',
+            name='broadcast_ids',
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 2.2.24 on 2026-10-18 14:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('eolzoom', '0020_remove_eolzoommappingusermeet_broadcast_ids'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='eolzoomeventinbox',
+            name='attempts',
+            field=models.PositiveIntegerField(default=0),
+        ),
+    ]
@@ -0,0 +1,22 @@
+# Generated by Django 2.2.24 on 2026-10-18 14:30
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('eolzoom', '0021_eolzoomeventinbox_attempts'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='eolzoomeventinbox',
+            name='dedup_key',
+            field=models.CharField(blank=True, max_length=255, null=True),
+        ),
+        migrations.AlterUniqueTogether(
+            name='eolzoomeventinbox',
+            unique_together={('event', 'dedup_key')},
+        ),
+    ]
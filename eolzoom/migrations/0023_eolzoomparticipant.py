@@ -0,0 +1,32 @@
+# Generated by Django 2.2.24 on 2026-10-18 16:10
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('eolzoom', '0022_eolzoomeventinbox_dedup_key'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='eolzoommappingusermeet',
+            name='meeting_uuid',
+            field=models.CharField(blank=True, default='', max_length=100),
+        ),
+        migrations.CreateModel(
+            name='EolZoomParticipant',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('meeting_id', models.CharField(max_length=50)),
+                ('meeting_uuid', models.CharField(blank=True, default='', max_length=100)),
+                ('participant_key', models.CharField(max_length=255)),
+                ('in_meeting', models.BooleanField(default=True)),
+                ('event_time', models.CharField(blank=True, default='', max_length=50)),
+            ],
+            options={
+                'unique_together': {('meeting_id', 'meeting_uuid', 'participant_key')},
+            },
+        ),
+    ]
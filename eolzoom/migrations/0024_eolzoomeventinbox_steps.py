@@ -0,0 +1,18 @@
+# Generated by Django 2.2.24 on 2026-10-18 18:20
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('eolzoom', '0023_eolzoomparticipant'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='eolzoomeventinbox',
+            name='steps',
+            field=models.CharField(blank=True, default='', max_length=255),
+        ),
+    ]
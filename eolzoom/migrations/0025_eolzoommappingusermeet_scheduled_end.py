@@ -0,0 +1,18 @@
+# Generated by Django 2.2.24 on 2026-10-18 18:45
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('eolzoom', '0024_eolzoomeventinbox_steps'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='eolzoommappingusermeet',
+            name='scheduled_end',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+    ]
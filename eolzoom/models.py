@@ -62,13 +62,107 @@ class EolZoomMappingUserMeet(models.Model):
         ]
     meeting_id = models.CharField(max_length=50, unique=True)
     user = models.ForeignKey(User, on_delete=models.CASCADE)
-    broadcast_ids = models.CharField(max_length=255, default="")
     is_enabled = models.BooleanField(default=False)
     restricted_access = models.BooleanField(default=False)
     course_key = CourseKeyField(max_length=255, default=None)
     usage_key = UsageKeyField(max_length=255, default=None)
     email_notification = models.BooleanField(default=False)
     title = models.CharField(max_length=250, default="")
+    # Scheduled end (start_time + duration) of the meeting, set when it is created/updated
+    scheduled_end = models.DateTimeField(null=True, blank=True)
+    # Meeting status, updated by zoom events
+    is_live = models.BooleanField(default=False)
+    meeting_uuid = models.CharField(max_length=100, default="", blank=True)  # current (or last) meeting instance
+    started_at = models.DateTimeField(null=True, blank=True)
+    ended_at = models.DateTimeField(null=True, blank=True)
+    participants_count = models.PositiveIntegerField(default=0)
+    attendance_count = models.PositiveIntegerField(default=0)
+    recording_url = models.TextField(default="", blank=True)
 
     def __str__(self):
         return '(%s) -> %s' % (self.user.username, self.meeting_id)
+
+
+class EolZoomBroadcast(models.Model):
+    """
+        Model with Youtube livebroadcasts of a meeting
+    """
+    class Meta:
+        index_together = [
+            ["meeting", "created"],
+        ]
+        unique_together = [
+            ["meeting", "broadcast_id"],
+        ]
+    meeting = models.ForeignKey(
+        EolZoomMappingUserMeet,
+        on_delete=models.CASCADE,
+        related_name="broadcasts")
+    broadcast_id = models.CharField(max_length=50)
+    created = models.DateTimeField(auto_now_add=True)
+    # Last known Youtube lifeCycleStatus (created, ready, live, complete...)
+    status = models.CharField(max_length=30, default="created")
+
+    def __str__(self):
+        return '(%s) %s -> %s' % (self.meeting.meeting_id, self.broadcast_id, self.status)
+
+
+class EolZoomParticipant(models.Model):
+    """
+        Model with the participants of a meeting instance (meeting uuid), updated by zoom events
+    """
+    class Meta:
+        unique_together = [
+            ["meeting_id", "meeting_uuid", "participant_key"],
+        ]
+    meeting_id = models.CharField(max_length=50)
+    meeting_uuid = models.CharField(max_length=100, default="", blank=True)
+    participant_key = models.CharField(max_length=255)
+    in_meeting = models.BooleanField(default=True)
+    # join_time or leave_time of the last applied event (older events are ignored)
+    event_time = models.CharField(max_length=50, default="", blank=True)
+
+    def __str__(self):
+        return '(%s) %s -> %s' % (self.meeting_id, self.participant_key, self.in_meeting)
+
+
+class EolZoomEventInbox(models.Model):
+    """
+        Model with Zoom webhook events, saved at reception and processed by a worker
+    """
+    class Meta:
+        unique_together = [
+            ["event", "dedup_key"],
+        ]
+    PENDING = 'pending'
+    PROCESSED = 'processed'
+    FAILED = 'failed'
+    STATUS_CHOICES = [
+        (PENDING, 'Pending'),
+        (PROCESSED, 'Processed'),
+        (FAILED, 'Failed'),
+    ]
+    event = models.CharField(max_length=100)
+    meeting_id = models.CharField(max_length=50, db_index=True)
+    # ZoomEvent.get_dedup_key(), repeated deliveries of an event are saved once
+    dedup_key = models.CharField(max_length=255, null=True, blank=True)
+    payload = models.TextField()
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default=PENDING, db_index=True)
+    attempts = models.PositiveIntegerField(default=0)
+    # Steps of the handler already done (comma separated), a retry only repeats the steps not done
+    steps = models.CharField(max_length=255, default="", blank=True)
+    remote_addr = models.CharField(max_length=100, default="")
+    server_name = models.CharField(max_length=255, default="")
+    created = models.DateTimeField(auto_now_add=True)
+    processed_at = models.DateTimeField(null=True, blank=True)
+
+    def __str__(self):
+        return '(%s) %s -> %s' % (self.meeting_id, self.event, self.status)
+
+    def is_step_done(self, step):
+        return step in self.steps.split(',')
+
+    def set_step_done(self, step):
+        if not self.is_step_done(step):
+            self.steps = ','.join([s for s in self.steps.split(',') if s] + [step])
+            self.save(update_fields=['steps'])
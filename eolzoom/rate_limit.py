@@ -0,0 +1,231 @@
+# -*- coding: utf-8 -*-
+"""
+    Rate governor for Zoom API calls.
+    Quotas are enforced per endpoint category (EOLZOOM_RATE_LIMITS) in each process
+    (token bucket) and per account across workers (cache backend).
+    Celery tasks wait for the quota (blocking), web requests have a small
+    budget of retries and waits (EOLZOOM_RATE_LIMIT_REQUEST_*) and fail fast.
+"""
+
+
+from django.conf import settings
+from django.core.cache import cache
+
+from . import http_client
+from datetime import datetime as dt
+from email.utils import parsedate_to_datetime
+import datetime
+import json
+import random
+import requests
+import threading
+import time
+
+import logging
+logger = logging.getLogger(__name__)
+
+WINDOW_CACHE_KEY = 'eolzoom:rate:{}:{}:{}'
+BLOCKED_CACHE_KEY = 'eolzoom:rate_blocked:{}:{}'
+
+_buckets = {}
+_buckets_lock = threading.Lock()
+
+
+class TokenBucket(object):
+    """
+        Thread-safe token bucket: 'rate' tokens per second, up to 'capacity' tokens (burst)
+    """
+
+    def __init__(self, rate, capacity):
+        self.rate = float(rate)
+        self.capacity = float(capacity)
+        self.tokens = float(capacity)
+        self.updated_at = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self):
+        """
+            Take one token, wait until one is available
+        """
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(
+                    self.capacity,
+                    self.tokens + (now - self.updated_at) * self.rate)
+                self.updated_at = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
+
+
+def get_bucket(category):
+    """
+        Get the process-wide bucket of an API category (EOLZOOM_RATE_LIMITS)
+    """
+    with _buckets_lock:
+        if category not in _buckets:
+            rate, capacity = settings.EOLZOOM_RATE_LIMITS[category]
+            _buckets[category] = TokenBucket(rate, capacity)
+        return _buckets[category]
+
+
+def wait_for_quota(category, account=None, max_wait=None):
+    """
+        Wait until a request of the category is allowed for the account.
+        Return False (without waiting) if the account/category is blocked for more than max_wait seconds
+    """
+    get_bucket(category).acquire()
+    return _wait_shared_quota(category, account or 'global', max_wait)
+
+
+def _wait_shared_quota(category, account, max_wait=None):
+    """
+        Per-second window counter shared by all workers through the cache.
+        Also wait while the account/category is blocked by a 429 response.
+    """
+    rate = settings.EOLZOOM_RATE_LIMITS[category][0]
+    while True:
+        now = time.time()
+        blocked_until = cache.get(BLOCKED_CACHE_KEY.format(account, category))
+        if blocked_until is not None and blocked_until > now:
+            if max_wait is not None and blocked_until - now > max_wait:
+                return False
+            time.sleep(blocked_until - now)
+            continue
+        window = int(now)
+        key = WINDOW_CACHE_KEY.format(account, category, window)
+        cache.add(key, 0, 2)
+        try:
+            count = cache.incr(key)
+        except ValueError:
+            # Cache backend without shared counters, local bucket is enough
+            return True
+        if count <= rate:
+            return True
+        time.sleep(window + 1 - now)
+
+
+def block(category, account, delay):
+    """
+        Block the account/category for all workers during 'delay' seconds
+    """
+    cache.set(
+        BLOCKED_CACHE_KEY.format(account, category),
+        time.time() + delay,
+        int(delay) + 1)
+
+
+def _parse_retry_after(value):
+    """
+        Retry-After header in seconds, HTTP date or ISO date. None if invalid
+    """
+    try:
+        return max(float(value), 0.)
+    except ValueError:
+        pass
+    try:
+        retry_date = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        try:
+            retry_date = dt.fromisoformat(value.replace('Z', '+00:00'))
+        except ValueError:
+            return None
+    if retry_date is None:
+        return None
+    if retry_date.tzinfo is None:
+        retry_date = retry_date.replace(tzinfo=datetime.timezone.utc)
+    now = dt.now(datetime.timezone.utc)
+    return max((retry_date - now).total_seconds(), 0.)
+
+
+def get_retry_delay(response, attempt, max_delay=None):
+    """
+        Seconds to wait before retrying a 429 response.
+        Use Retry-After if present, else jittered exponential backoff.
+        Return None when the wait exceeds max_delay (default EOLZOOM_RATE_LIMIT_MAX_DELAY, e.g. daily limit)
+    """
+    if max_delay is None:
+        max_delay = settings.EOLZOOM_RATE_LIMIT_MAX_DELAY
+    headers = getattr(response, 'headers', None) or {}
+    retry_after = headers.get('Retry-After')
+    if retry_after:
+        delay = _parse_retry_after(retry_after)
+        if delay is not None:
+            if delay > max_delay:
+                return None
+            return delay
+    backoff = settings.EOLZOOM_RATE_LIMIT_BACKOFF * 2 ** attempt
+    return random.uniform(0, min(max_delay, backoff))
+
+
+def _check_remaining(response, category, account):
+    """
+        If X-RateLimit-Remaining is exhausted block the category until Retry-After (or one second)
+    """
+    headers = getattr(response, 'headers', None) or {}
+    remaining = headers.get('X-RateLimit-Remaining')
+    if remaining is None:
+        return
+    try:
+        if int(remaining) > 0:
+            return
+    except ValueError:
+        return
+    delay = _parse_retry_after(headers.get('Retry-After', '1'))
+    if delay is not None:
+        block(category, account, min(delay, settings.EOLZOOM_RATE_LIMIT_MAX_DELAY))
+
+
+def _throttled_response(url):
+    """
+        429 response returned without calling Zoom when the account is blocked
+        (body with the Zoom error format, callers check 'code')
+    """
+    r = requests.Response()
+    r.status_code = 429
+    r.url = url
+    r._content = json.dumps({
+        'code': 429,
+        'message': 'Too many requests, Zoom API rate limit reached'}).encode('utf-8')
+    return r
+
+
+def zoom_request(method, url, category, account=None, blocking=True, **kwargs):
+    """
+        Send a Zoom API request through the rate governor.
+        429 responses are retried (max EOLZOOM_RATE_LIMIT_MAX_RETRIES).
+        blocking=False (web requests): max EOLZOOM_RATE_LIMIT_REQUEST_MAX_RETRIES retries
+        and waits of EOLZOOM_RATE_LIMIT_REQUEST_MAX_DELAY seconds, else return the 429 response
+    """
+    account = account or 'global'
+    if blocking:
+        max_retries = settings.EOLZOOM_RATE_LIMIT_MAX_RETRIES
+        max_delay = settings.EOLZOOM_RATE_LIMIT_MAX_DELAY
+    else:
+        max_retries = settings.EOLZOOM_RATE_LIMIT_REQUEST_MAX_RETRIES
+        max_delay = settings.EOLZOOM_RATE_LIMIT_REQUEST_MAX_DELAY
+    for attempt in range(max_retries + 1):
+        if not wait_for_quota(category, account, max_delay):
+            logger.error(
+                "Zoom rate limit blocked, url: {}, account: {}".format(url, account))
+            return _throttled_response(url)
+        r = getattr(http_client, method.lower())(url, **kwargs)
+        if r.status_code != 429:
+            _check_remaining(r, category, account)
+            return r
+        delay = get_retry_delay(r, attempt, max_delay)
+        headers = getattr(r, 'headers', None) or {}
+        if delay is None or attempt == max_retries:
+            logger.error(
+                "Zoom rate limit exceeded, url: {}, account: {}, type: {}".format(
+                    url, account, headers.get('X-RateLimit-Type')))
+            return r
+        logger.warning(
+            "Zoom rate limit reached, url: {}, account: {}, type: {}. Retry ({}) in {:.2f}s".format(
+                url, account, headers.get('X-RateLimit-Type'), attempt + 1, delay))
+        block(category, account, delay)
+        time.sleep(delay)
+    return r
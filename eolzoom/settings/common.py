@@ -14,3 +14,48 @@ def plugin_settings(settings):
     settings.GOOGLE_REDIRECT_URIS = []
     settings.GOOGLE_JAVASCRIPT_ORIGINS = []
     settings.EOLZOOM_YOUTUBE_TIMEZONE = ''
+    settings.EOLZOOM_ACCESS_TOKEN_EXPIRY_MARGIN = 300  # seconds
+    settings.EOLZOOM_TASK_ACCESS_TOKEN_MIN_TTL = 1800  # seconds, tokens used by register tasks
+    settings.EOLZOOM_HTTP_TIMEOUT = (3.05, 30)  # (connect, read) seconds
+    settings.EOLZOOM_HTTP_POOL_SIZES = {
+        'https://api.zoom.us': 30,
+        'https://zoom.us': 5,
+        'https://www.googleapis.com': 10,
+        'https://oauth2.googleapis.com': 5,
+    }
+    settings.EOLZOOM_REGISTER_MODE = 'threads'  # 'threads' or 'asyncio'
+    settings.EOLZOOM_REGISTRANT_WORKERS = 4  # max threads registering students
+    settings.EOLZOOM_REGISTRANT_ASYNC_CONCURRENCY = 20  # max requests in flight (asyncio mode)
+    settings.EOLZOOM_REGISTRANT_BULK_SIZE = 500  # join urls saved per query
+    settings.EOLZOOM_STUDENTS_CHUNK_SIZE = 2000  # enrolled students fetched per query
+    # Zoom API category: (requests per second, burst)
+    settings.EOLZOOM_RATE_LIMITS = {
+        'light': (20, 20),
+        'medium': (10, 10),
+        'registrants': (10, 10),
+    }
+    settings.EOLZOOM_RATE_LIMIT_MAX_RETRIES = 10
+    settings.EOLZOOM_RATE_LIMIT_BACKOFF = 0.5  # seconds, doubled on each retry
+    settings.EOLZOOM_RATE_LIMIT_MAX_DELAY = 60  # seconds
+    settings.EOLZOOM_RATE_LIMIT_REQUEST_MAX_RETRIES = 1  # web requests (blocking=False)
+    settings.EOLZOOM_RATE_LIMIT_REQUEST_MAX_DELAY = 2  # seconds, web requests (blocking=False)
+    # Register students of restricted meetings when the meeting is scheduled
+    settings.EOLZOOM_PREREGISTER_STUDENTS = False
+    settings.EOLZOOM_EVENT_STALE_TIMEOUT = 30 * 60  # seconds, pending events are queued again after it
+    settings.EOLZOOM_EVENT_MAX_ATTEMPTS = 5  # processing attempts of an event (requeue_eolzoom_events)
+    settings.EOLZOOM_EVENT_RETENTION = 7 * 24 * 60 * 60  # seconds, processed events are deleted after it (requeue_eolzoom_events)
+    settings.EOLZOOM_EVENT_LOW_PRIORITY_QUEUE = 'edx.lms.core.default'  # participant events (many by meeting)
+    settings.EOLZOOM_JOIN_URL_CACHE_TIMEOUT = 6 * 60 * 60  # seconds
+    settings.EOLZOOM_MEETING_LIVE_CACHE_TIMEOUT = 60  # seconds
+    settings.EOLZOOM_JOIN_URL_WAIT_TIMEOUT = 60  # seconds, max wait of a student for the join url (polling in the browser)
+    settings.EOLZOOM_JOIN_URL_RETRY_AFTER = 2  # seconds, first poll delay of a student waiting the join url (backoff)
+    settings.EOLZOOM_MEETING_END_MARGIN = 2 * 60 * 60  # seconds, meetings keep their registrants updated after the scheduled end
+    settings.EOLZOOM_JOIN_URL_PENDING_TIMEOUT = 30 * 60  # seconds, max duration of the registration of a started meeting
+    settings.EOLZOOM_STUDENTS_COUNT_CACHE_TIMEOUT = 60 * 60  # seconds, enrolled students in studio_view
+    # Meeting start emails run out of the high priority queue. A dedicated queue is opt-in
+    # (a celery worker must consume it, e.g. celery worker -Q edx.lms.core.eolzoom_email)
+    settings.EOLZOOM_EMAIL_QUEUE = 'edx.lms.core.default'
+    settings.EOLZOOM_EMAIL_RATE_LIMIT = '30/m'  # email tasks per worker
+    settings.EOLZOOM_EMAIL_CHUNK_SIZE = 100  # recipients per meeting start email task
+    settings.EOLZOOM_EMAIL_CHUNK_INTERVAL = 2  # seconds between queued chunks
+    settings.EOLZOOM_EMAIL_CONTEXT_CACHE_TIMEOUT = 300  # seconds, meeting start email by block
@@ -0,0 +1,145 @@
+# -*- coding: utf-8 -*-
+"""
+    Keep registrants of restricted meetings up to date with course enrollments
+"""
+
+
+import datetime
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db import transaction
+from django.conf import settings
+from django.db.models import Q
+from django.dispatch import receiver
+from django.utils import timezone
+
+from celery import task
+from common.djangoapps.student.models import EnrollStatusChange
+from common.djangoapps.student.signals import ENROLL_STATUS_CHANGE
+from opaque_keys.edx.keys import CourseKey
+from .eolzoom import STUDENTS_COUNT_CACHE_KEY
+from .models import EolZoomRegistrant, EolZoomMappingUserMeet
+from .views import get_user_access_token, get_meeting_registrant, set_registrant_status, get_registrant_info, get_registrant_platform_name, set_cached_join_urls, delete_cached_join_urls
+
+import logging
+logger = logging.getLogger(__name__)
+
+REGISTRANT_DEFAULT_RETRY_DELAY = 30
+REGISTRANT_MAX_RETRIES = 5
+
+
+@receiver(ENROLL_STATUS_CHANGE)
+def enroll_status_change(sender, event=None, user=None, course_id=None, **kwargs):
+    """
+        Register (or cancel) the student in restricted meetings of the course
+        that have already registered their students
+    """
+    if event not in (EnrollStatusChange.enroll, EnrollStatusChange.unenroll):
+        return
+    # Enrolled students count of studio_view
+    cache.delete(STUDENTS_COUNT_CACHE_KEY.format(course_id))
+    if not get_upcoming_meetings(course_id).exists():
+        return
+    is_enrolled = event == EnrollStatusChange.enroll
+    user_id = user.id
+    transaction.on_commit(
+        lambda: update_enrollment_registrant.delay(user_id, str(course_id), is_enrolled))
+
+
+@task(
+    bind=True,
+    queue='edx.lms.core.high',
+    default_retry_delay=REGISTRANT_DEFAULT_RETRY_DELAY,
+    max_retries=REGISTRANT_MAX_RETRIES)
+def update_enrollment_registrant(self, user_id, course_id, is_enrolled, meeting_ids=None):
+    """
+        Register or cancel one student in every registered restricted meeting of the course
+        that is upcoming or live (get_upcoming_meetings).
+        Meetings that fail are retried (meeting_ids)
+    """
+    student = User.objects.select_related('profile').get(id=user_id)
+    course_key = CourseKey.from_string(course_id)
+    meetings = get_upcoming_meetings(course_key).exclude(user=student)
+    if meeting_ids is not None:
+        meetings = meetings.filter(meeting_id__in=meeting_ids)
+    failed = []
+    for meeting in meetings:
+        # Meetings without registrants will register all the students at start
+        if not EolZoomRegistrant.objects.filter(meeting_id=meeting.meeting_id).exists():
+            continue
+        token = get_user_access_token(meeting.user)
+        if 'error' in token:
+            logger.error("EolZoom - Error get_access_token {}, user: {}, meet_id: {}".format(token['error'], meeting.user, meeting.meeting_id))
+            failed.append(meeting.meeting_id)
+            continue
+        if is_enrolled:
+            updated = register_student(meeting, student, token['access_token'])
+        else:
+            updated = cancel_student(meeting, student, token['access_token'])
+        if not updated:
+            failed.append(meeting.meeting_id)
+    if failed:
+        logger.error("EolZoom - Error update registrant, user: {}, meetings: {}".format(user_id, failed))
+        raise self.retry(kwargs={
+            'user_id': user_id,
+            'course_id': course_id,
+            'is_enrolled': is_enrolled,
+            'meeting_ids': failed})
+
+
+def get_upcoming_meetings(course_key):
+    """
+        Restricted meetings of the course scheduled to end in the future (or in the last
+        EOLZOOM_MEETING_END_MARGIN seconds, meetings running late) or started recently.
+        Meetings without scheduled end (created before it was saved) are skipped,
+        their students are reconciled when the meeting starts
+    """
+    since = timezone.now() - datetime.timedelta(seconds=settings.EOLZOOM_MEETING_END_MARGIN)
+    return EolZoomMappingUserMeet.objects.filter(
+        Q(scheduled_end__gte=since) | Q(is_live=True, started_at__gte=since),
+        course_key=course_key,
+        restricted_access=True)
+
+
+def register_student(meeting, student, access_token):
+    """
+        Create and approve the registrant, save the join url
+    """
+    student_info = get_registrant_info(student, get_registrant_platform_name())
+    data = get_meeting_registrant(
+        meeting.meeting_id, meeting.user, student_info, access_token)
+    if 'registrant_id' not in data or 'error' in data:
+        return False
+    status = set_registrant_status(
+        meeting.meeting_id,
+        meeting.user,
+        [{'id': data['registrant_id'], 'email': student.email}],
+        access_token)
+    if 'error' in status:
+        return False
+    EolZoomRegistrant.objects.update_or_create(
+        meeting_id=meeting.meeting_id,
+        email=student.email,
+        defaults={'join_url': data['join_url']})
+    set_cached_join_urls(meeting.meeting_id, {student.email: data['join_url']})
+    return True
+
+
+def cancel_student(meeting, student, access_token):
+    """
+        Cancel the registrant and remove the join url
+    """
+    status = set_registrant_status(
+        meeting.meeting_id,
+        meeting.user,
+        [{'email': student.email}],
+        access_token,
+        action='cancel')
+    if 'error' in status:
+        return False
+    EolZoomRegistrant.objects.filter(
+        meeting_id=meeting.meeting_id,
+        email=student.email).delete()
+    delete_cached_join_urls(meeting.meeting_id, [student.email])
+    return True
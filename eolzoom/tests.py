@@ -6,9 +6,15 @@ from collections import namedtuple
 
 import json
 import base64
+import asyncio
+import hashlib
 
 from django.test import TestCase, Client
+from django.core.cache.backends.locmem import LocMemCache
+from django.core import mail
+from django.conf import settings
 from django.urls import reverse
+from django.utils import timezone
 
 from common.djangoapps.util.testing import UrlResetMixin
 from xmodule.modulestore import ModuleStoreEnum
@@ -19,14 +25,15 @@ from common.djangoapps.student.tests.factories import UserFactory, CourseEnrollm
 from xblock.field_data import DictFieldData
 from common.djangoapps.student.roles import CourseStaffRole
 from opaque_keys.edx.keys import CourseKey, UsageKey
+from celery.exceptions import Retry
 from django.test.utils import override_settings
 from .eolzoom import EolZoomXBlock
 from django.contrib.auth.models import AnonymousUser
 from six import text_type
 import urllib.parse
 from urllib.parse import parse_qs
-from . import views, youtube_views, utils_youtube, email_tasks
-from .models import EolZoomAuth, EolZoomRegistrant, EolGoogleAuth, EolZoomMappingUserMeet
+from . import views, youtube_views, utils_youtube, email_tasks, http_client, rate_limit, async_registrant, signals, webhooks
+from .models import EolZoomAuth, EolZoomRegistrant, EolGoogleAuth, EolZoomMappingUserMeet, EolZoomEventInbox, EolZoomBroadcast, EolZoomParticipant
 from datetime import datetime as dt
 import datetime
 import logging
@@ -138,7 +145,7 @@ class TestEolZoomAPI(UrlResetMixin, ModuleStoreTestCase):
         new_refresh_token = views._get_refresh_token(new_student)
         self.assertEqual(new_refresh_token, None)
 
-    @patch("requests.post")
+    @patch("eolzoom.http_client.post")
     def test_get_refresh_token_from_zoom_api(self, post):
         """
             Test post request to zoom api (get refresh token)
@@ -161,7 +168,7 @@ class TestEolZoomAPI(UrlResetMixin, ModuleStoreTestCase):
             authorization_code, redirect_uri)
         self.assertEqual(new_refresh_token, response)
 
-    @patch("requests.post")
+    @patch("eolzoom.http_client.post")
     def test_get_access_token_from_zoom_api(self, post):
         """
             Test post request to zoom api (get access token)
@@ -190,7 +197,83 @@ class TestEolZoomAPI(UrlResetMixin, ModuleStoreTestCase):
             zoom_auth.zoom_refresh_token,
             response['refresh_token'])
 
-    @patch("requests.get")
+    @patch("eolzoom.views.cache", LocMemCache('eolzoom_tests', {}))
+    @patch("eolzoom.http_client.post")
+    def test_get_user_access_token_cached(self, post):
+        """
+            Test access token is reused from cache until it expires
+            1. First call refresh the token from zoom api
+            2. Second call use the cached token
+            3. Token with short expires_in is not cached
+            4. Token valid for less than min_ttl seconds is refreshed
+        """
+        response = {
+            "access_token": "access_token_1",
+            "token_type": "bearer",
+            "refresh_token": "refresh_token_1",
+            "expires_in": 3599,
+            "scope": "user:read"
+        }
+        post.side_effect = [
+            namedtuple(
+                "Request", [
+                    "status_code", "json"])(
+                200, lambda:response), ]
+        token = views.get_user_access_token(self.user)
+        self.assertEqual(token['access_token'], 'access_token_1')
+        token = views.get_user_access_token(self.user)
+        self.assertEqual(token['access_token'], 'access_token_1')
+        self.assertNotIn('refresh_token', token)
+        self.assertEqual(post.call_count, 1)
+
+        new_student = UserFactory(
+            username='test_student',
+            password='test_password',
+            email='test_email@email.email')
+        views._update_auth(new_student, 'new_token')
+        short_response = {
+            "access_token": "access_token_2",
+            "refresh_token": "refresh_token_2",
+            "expires_in": 60,
+        }
+        post.side_effect = [
+            namedtuple(
+                "Request", [
+                    "status_code", "json"])(
+                200, lambda:short_response),
+            namedtuple(
+                "Request", [
+                    "status_code", "json"])(
+                200, lambda:short_response), ]
+        views.get_user_access_token(new_student)
+        views.get_user_access_token(new_student)
+        self.assertEqual(post.call_count, 3)
+
+        # Token cached for less than min_ttl seconds is refreshed
+        post.side_effect = [
+            namedtuple(
+                "Request", [
+                    "status_code", "json"])(
+                200, lambda:response), ]
+        token = views.get_user_access_token(self.user, min_ttl=3600)
+        self.assertEqual(token['access_token'], 'access_token_1')
+        self.assertEqual(post.call_count, 4)
+
+    @patch("eolzoom.views.cache")
+    @patch("eolzoom.http_client.post")
+    def test_get_user_access_token_refreshed_in_flight(self, post, cache):
+        """
+            Test that a request waiting for the refresh lock reuses the token
+            refreshed by the request already in flight
+        """
+        cache.get.side_effect = [None, {'access_token': 'access_token_1', 'expires_in': 3599}]
+        token = views.get_user_access_token(self.user)
+        self.assertEqual(token['access_token'], 'access_token_1')
+        self.assertEqual(post.call_count, 0)
+        zoom_auth = EolZoomAuth.objects.get(user=self.user)
+        self.assertEqual(zoom_auth.zoom_refresh_token, 'test_refresh_token')
+
+    @patch("eolzoom.http_client.get")
     def test_get_user_profile_from_zoom_api(self, get):
         """
             Test get request to zoom api (get user profile)
@@ -211,8 +294,8 @@ class TestEolZoomAPI(UrlResetMixin, ModuleStoreTestCase):
         user_profile = views.get_user_profile(access_token)
         self.assertEqual(user_profile, response)
 
-    @patch("requests.post")
-    @patch("requests.get")
+    @patch("eolzoom.http_client.post")
+    @patch("eolzoom.http_client.get")
     def test_get_user_profile(self, get, post):
         """
             Test function that generate tokens and call get_user_profile from zoom api
@@ -247,7 +330,7 @@ class TestEolZoomAPI(UrlResetMixin, ModuleStoreTestCase):
         user_profile = views._get_user_profile(self.user)
         self.assertEqual(user_profile, user_profile_response)
 
-    @patch("requests.post")
+    @patch("eolzoom.http_client.post")
     def test_new_scheduled_meeting(self, post):
         """
             Test create a new scheduled meeting
@@ -298,9 +381,71 @@ class TestEolZoomAPI(UrlResetMixin, ModuleStoreTestCase):
             reverse('new_scheduled_meeting'), post_data)
         data = response.json()
         self.assertEqual(data['meeting_id'], create_meeting_response['id'])
+        # 10:10 + 40 minutes in America/Santiago (UTC-3)
+        self.assertEqual(
+            EolZoomMappingUserMeet.objects.get(meeting_id='meeting_id').scheduled_end,
+            datetime.datetime(2020, 10, 10, 13, 50, tzinfo=datetime.timezone.utc))
 
-    @patch("requests.post")
-    @patch("requests.patch")
+    @override_settings(EOLZOOM_PREREGISTER_STUDENTS=True)
+    @patch("eolzoom.views.task_register_meeting_users")
+    @patch("eolzoom.http_client.post")
+    def test_new_scheduled_meeting_preregister(self, post, task_register_meeting_users):
+        """
+            Test students are registered in background when a restricted meeting is scheduled
+        """
+        access_token_response = {
+            "access_token": "access_token",
+            "refresh_token": "refresh_token",
+            "expires_in": 3599,
+        }
+        create_meeting_response = {
+            "id": 'meeting_id',
+            "start_url": 'start_url_example',
+            "join_url": 'join_url_example',
+        }
+        post.side_effect = [
+            namedtuple(
+                "Request", [
+                    "status_code", "json"])(
+                200, lambda:access_token_response), namedtuple(
+                    "Request", [
+                        "status_code", "json"])(
+                            201, lambda:create_meeting_response), ]
+        post_data = {
+            'display_name': 'display_name',
+            'description': 'description',
+            'date': '2020-10-10',
+            'time': '10:10',
+            'duration': '40',
+            'google_access': 'false',
+            'restricted_access': 'true',
+            'email_notification': 'true',
+            'course_id': str(self.course.id),
+            'block_id': self.block_id
+        }
+        response = self.client.post(
+            reverse('new_scheduled_meeting'), post_data)
+        self.assertEqual(response.status_code, 200)
+        args, kwargs = task_register_meeting_users.call_args
+        self.assertEqual(args[1], self.user)
+        self.assertEqual(args[2], 'meeting_id')
+        self.assertEqual(args[3], str(self.course.id))
+        self.assertEqual(args[5], False)  # emails are sent when the meeting starts
+        self.assertEqual(kwargs, {'preregister': True})
+
+        # Preregister errors don't fail the scheduled meeting
+        create_meeting_response['id'] = 'meeting_id_2'
+        post.side_effect = [
+            namedtuple("Request", ["status_code", "json"])(200, lambda:access_token_response),
+            namedtuple("Request", ["status_code", "json"])(201, lambda:create_meeting_response), ]
+        task_register_meeting_users.side_effect = Exception('broker error')
+        response = self.client.post(
+            reverse('new_scheduled_meeting'), post_data)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['meeting_id'], 'meeting_id_2')
+
+    @patch("eolzoom.http_client.post")
+    @patch("eolzoom.http_client.patch")
     def test_update_scheduled_meeting(self, patch, post):
         """
             Test update a new scheduled meeting
@@ -346,8 +491,8 @@ class TestEolZoomAPI(UrlResetMixin, ModuleStoreTestCase):
         data = response.json()
         self.assertEqual(data['meeting_id'], post_data['meeting_id'])
 
-    @patch("requests.post")
-    @patch("requests.patch")
+    @patch("eolzoom.http_client.post")
+    @patch("eolzoom.http_client.patch")
     def test_update_scheduled_meeting_user_meet_mapping_exists(self, patch, post):
         """
             Test update a new scheduled meeting when EolZoomMappingUserMeet already exists
@@ -402,8 +547,8 @@ class TestEolZoomAPI(UrlResetMixin, ModuleStoreTestCase):
         self.assertEqual(user_model.course_key, self.course.id)
         self.assertEqual(user_model.usage_key, UsageKey.from_string(self.block_id))
 
-    @patch("requests.post")
-    @patch("requests.get")
+    @patch("eolzoom.http_client.post")
+    @patch("eolzoom.http_client.get")
     def test_is_logged_zoom(self, get, post):
         """
             Check response status code at is_logged_zoom
@@ -437,7 +582,7 @@ class TestEolZoomAPI(UrlResetMixin, ModuleStoreTestCase):
         response = self.client.get(reverse('is_logged_zoom'))
         self.assertEqual(response.status_code, 200)
 
-    @patch("requests.post")
+    @patch("eolzoom.http_client.post")
     def test_zoom_api(self, post):
         """
             Check response status code at zoom_api
@@ -462,6 +607,105 @@ class TestEolZoomAPI(UrlResetMixin, ModuleStoreTestCase):
         response = self.client.get(reverse('zoom_api'), get_data)
         self.assertEqual(response.status_code, 302)
 
+    @patch("requests.Session.request")
+    def test_http_client_shared_session(self, session_request):
+        """
+            Test all requests use the same session with a default timeout
+        """
+        session_request.return_value = namedtuple("Request", ["status_code",])(200,)
+        http_client.get('https://api.zoom.us/v2/users/me')
+        http_client.post('https://zoom.us/oauth/token', timeout=5)
+        self.assertIs(http_client.get_session(), http_client.get_session())
+        first_call, second_call = session_request.call_args_list
+        self.assertEqual(first_call[0], ('GET', 'https://api.zoom.us/v2/users/me'))
+        self.assertEqual(first_call[1]['timeout'], (3.05, 30))
+        self.assertEqual(second_call[1]['timeout'], 5)
+
+    @patch("eolzoom.rate_limit.time.sleep")
+    def test_token_bucket(self, sleep):
+        """
+            Test token bucket allow a burst of 'capacity' requests and then wait
+        """
+        bucket = rate_limit.TokenBucket(rate=1000000, capacity=2)
+        bucket.acquire()
+        bucket.acquire()
+        self.assertEqual(sleep.call_count, 0)
+
+        bucket = rate_limit.TokenBucket(rate=0.000001, capacity=1)
+        bucket.acquire()
+        bucket.tokens = 0
+        with patch("eolzoom.rate_limit.time.monotonic", side_effect=[0, 1000000000]):
+            bucket.updated_at = 0
+            bucket.acquire()
+        self.assertEqual(sleep.call_count, 1)
+
+    @patch("eolzoom.rate_limit.time.sleep")
+    @patch("eolzoom.http_client.post")
+    def test_zoom_request_retry_after(self, post, sleep):
+        """
+            Test rate governor retry 429 responses
+            1. Wait Retry-After seconds and retry
+            2. Without headers use jittered exponential backoff
+            3. Retry-After greater than EOLZOOM_RATE_LIMIT_MAX_DELAY (daily limit) is not retried
+        """
+        Response = namedtuple("Request", ["status_code", "headers"])
+        post.side_effect = [
+            Response(429, {'Retry-After': '2', 'X-RateLimit-Type': 'QPS'}),
+            Response(201, {}), ]
+        r = rate_limit.zoom_request('POST', 'https://api.zoom.us/v2/meetings/1/registrants', category='registrants', account=self.user.id)
+        self.assertEqual(r.status_code, 201)
+        self.assertEqual(post.call_count, 2)
+        self.assertIn(2., [call[0][0] for call in sleep.call_args_list])
+
+        post.reset_mock()
+        sleep.reset_mock()
+        post.side_effect = [
+            namedtuple("Request", ["status_code",])(429,),
+            Response(201, {}), ]
+        r = rate_limit.zoom_request('POST', 'https://api.zoom.us/v2/meetings/1/registrants', category='registrants')
+        self.assertEqual(r.status_code, 201)
+        self.assertTrue(0 <= sleep.call_args_list[-1][0][0] <= 0.5)
+
+        post.reset_mock()
+        post.side_effect = [
+            Response(429, {'Retry-After': '2030-01-01T00:00:00Z', 'X-RateLimit-Type': 'Daily-limit'}), ]
+        r = rate_limit.zoom_request('POST', 'https://api.zoom.us/v2/meetings/1/registrants', category='registrants')
+        self.assertEqual(r.status_code, 429)
+        self.assertEqual(post.call_count, 1)
+
+    @patch("eolzoom.rate_limit.cache", LocMemCache('eolzoom_rate_tests', {}))
+    @patch("eolzoom.rate_limit.time.sleep")
+    @patch("eolzoom.http_client.get")
+    def test_zoom_request_not_blocking(self, get, sleep):
+        """
+            Test web requests (blocking=False) fail fast
+            1. Retry-After greater than EOLZOOM_RATE_LIMIT_REQUEST_MAX_DELAY is not retried
+            2. Blocked account returns 429 without calling Zoom
+        """
+        Response = namedtuple("Request", ["status_code", "headers"])
+        get.side_effect = [Response(429, {'Retry-After': '30'}), ]
+        r = rate_limit.zoom_request('GET', 'https://api.zoom.us/v2/users/me', category='light', account=self.user.id, blocking=False)
+        self.assertEqual(r.status_code, 429)
+        self.assertEqual(get.call_count, 1)
+        self.assertEqual(sleep.call_count, 0)
+
+        rate_limit.block('light', self.user.id, 30)
+        r = rate_limit.zoom_request('GET', 'https://api.zoom.us/v2/users/me', category='light', account=self.user.id, blocking=False)
+        self.assertEqual(r.status_code, 429)
+        self.assertEqual(r.json()['code'], 429)
+        self.assertEqual(get.call_count, 1)
+
+        # The blocked host is not logged in, other hosts are not blocked
+        with patch('eolzoom.views._get_refresh_token', return_value='refresh_token'):
+            with patch('eolzoom.views.get_user_access_token', return_value={'access_token': 'access_token'}):
+                self.assertIsNone(views._get_user_profile(self.user))
+        get.side_effect = [Response(200, {}), ]
+        r = rate_limit.zoom_request('GET', 'https://api.zoom.us/v2/users/me', category='light', account=self.aux_user.id, blocking=False)
+        self.assertEqual(r.status_code, 200)
+        self.assertEqual(get.call_count, 2)
+        self.assertEqual(get.call_count, 1)
+        self.assertEqual(sleep.call_count, 0)
+
     def test_get_students(self):
         """
             Test if get_students is giving the correct enrolled students
@@ -479,7 +723,36 @@ class TestEolZoomAPI(UrlResetMixin, ModuleStoreTestCase):
         students = views.get_students(self.user, text_type(self.course.id))
         self.assertEqual(len(students), 1)
 
-    @patch("requests.post")
+    def test_iter_students(self):
+        """
+            Test iter_students stream the students with their profile in one query
+        """
+        for i in range(3):
+            CourseEnrollmentFactory(
+                user=UserFactory(email='student{}@email.email'.format(i)),
+                course_id=self.course.id)
+        with self.assertNumQueries(1):
+            students = [
+                views.get_registrant_info(student, 'PLATFORM')
+                for student in views.iter_students(self.user, text_type(self.course.id))]
+        self.assertEqual(
+            sorted(student['email'] for student in students),
+            ['student0@email.email', 'student1@email.email', 'student2@email.email'])
+
+    def test_register_students_threads_chunks(self):
+        """
+            Test students iterator is registered by chunks of MAX_REGISTRANT_STATUS
+        """
+        progress = Mock()
+        with patch("eolzoom.views.meeting_registrant", return_value=True) as meeting_registrant:
+            views._register_students_threads(
+                self.user, 'meeting_id', iter(range(65)), 'access_token', progress)
+        self.assertEqual(meeting_registrant.call_count, 3)
+        self.assertEqual(
+            sorted(call[0] for call in progress.call_args_list),
+            [(5, True), (30, True), (30, True)])
+
+    @patch("eolzoom.http_client.post")
     def test_get_meeting_registrant(self, post):
         """
             Test creating a meeting registrant for a student.
@@ -521,7 +794,7 @@ class TestEolZoomAPI(UrlResetMixin, ModuleStoreTestCase):
             'meeting_id', self.user, student_info, access_token)
         self.assertEqual(meeting_registrant, {'error': 'Registration fail'})
 
-    @patch("requests.put")
+    @patch("eolzoom.http_client.put")
     def test_set_meeting_status(self, put):
         """
             Test set meeting for a set of students
@@ -600,6 +873,76 @@ class TestEolZoomAPI(UrlResetMixin, ModuleStoreTestCase):
             self.user, 'meeting_id', students, access_token)
         self.assertEqual(meeting_registrant, False)
 
+    def test_async_register_chunks(self):
+        """
+            Test asyncio engine register and approve students by chunks
+        """
+        methods = []
+
+        async def zoom_request(session, semaphore, method, url, account, **kwargs):
+            methods.append(method)
+            if method == 'POST':
+                return 201, {'registrant_id': json.loads(kwargs['data'])['email']}
+            return 204, ''
+
+        results = []
+        students_info = [
+            {'email': 'email{}'.format(i), 'first_name': 'first_name', 'last_name': 'platform_name'}
+            for i in range(35)]
+        with patch('eolzoom.async_registrant._zoom_request', new=zoom_request):
+            asyncio.run(async_registrant.register_chunks(
+                None, self.user.id, 'meeting_id', students_info, results, 5))
+        self.assertEqual(methods.count('POST'), 35)
+        self.assertEqual(methods.count('PUT'), 2)
+        self.assertEqual(sorted(results), [(5, True), (30, True)])
+
+    @override_settings(EOLZOOM_REGISTRANT_ASYNC_CONCURRENCY=2)
+    @patch('eolzoom.async_registrant.get_registrant_info')
+    def test_async_register_students_batches(self, get_registrant_info):
+        """
+            Test asyncio engine consume students by batches and report progress out of the event loop
+        """
+        batches = []
+
+        async def register_students(account, meeting_id, students_info, access_token, results):
+            batches.append(len(students_info))
+            results.append((len(students_info), True))
+
+        def check_progress(students_count, registered):
+            with self.assertRaises(RuntimeError):
+                asyncio.get_running_loop()
+
+        progress = Mock(side_effect=check_progress)
+        get_registrant_info.side_effect = lambda student, platform_name: {'email': student}
+        students = ('email{}'.format(i) for i in range(130))
+        with patch('eolzoom.async_registrant._register_students', new=register_students):
+            async_registrant.register_students(self.user, 'meeting_id', students, 'access_token', progress)
+        self.assertEqual(batches, [60, 60, 10])
+        self.assertEqual(progress.call_count, 3)
+
+    def test_async_register_chunks_errors(self):
+        """
+            Test asyncio engine report failed registrants and chunks without aborting the others
+        """
+        async def zoom_request(session, semaphore, method, url, account, **kwargs):
+            data = json.loads(kwargs['data'])
+            if method == 'POST':
+                if data['email'] == 'email3':
+                    return None, {}
+                return 201, {'registrant_id': data['email']}
+            if data['registrants'][0]['email'] == 'email30':
+                raise RuntimeError('connection reset')
+            return 204, ''
+
+        results = []
+        students_info = [
+            {'email': 'email{}'.format(i), 'first_name': 'first_name', 'last_name': 'platform_name'}
+            for i in range(35)]
+        with patch('eolzoom.async_registrant._zoom_request', new=zoom_request):
+            asyncio.run(async_registrant.register_chunks(
+                None, self.user.id, 'meeting_id', students_info, results, 5))
+        self.assertEqual(sorted(results), [(1, False), (5, False), (29, True)])
+
     def test_submit_join_url(self):
         """
             Test submit join url into model
@@ -631,15 +974,180 @@ class TestEolZoomAPI(UrlResetMixin, ModuleStoreTestCase):
                 'join_url': "join_url_4"
             },
         ]
-        views._submit_join_url(students, meeting_id, self.block_id, True)
+        result = views._submit_join_url(students, meeting_id, self.block_id, True)
         registrants = EolZoomRegistrant.objects.filter(meeting_id=meeting_id)
         self.assertEqual(registrants.count(), 4)
+        self.assertEqual(result, {'inserted': 4, 'existing': 0})
 
-        views._submit_join_url(students, meeting_id, self.block_id, True)
+        result = views._submit_join_url(students, meeting_id, self.block_id, True)
         registrants = EolZoomRegistrant.objects.filter(meeting_id=meeting_id)
         self.assertEqual(registrants.count(), 4)
+        self.assertEqual(result, {'inserted': 0, 'existing': 4})
+
+        students.append({'email': "email5", 'join_url': "join_url_5"})
+        with self.settings(EOLZOOM_REGISTRANT_BULK_SIZE=2):
+            result = views._submit_join_url(students, meeting_id, self.block_id, True)
+        registrants = EolZoomRegistrant.objects.filter(meeting_id=meeting_id)
+        self.assertEqual(registrants.count(), 5)
+        self.assertEqual(result, {'inserted': 1, 'existing': 4})
+
+    def test_submit_join_url_conflicts(self):
+        """
+            Test rows dropped by bulk_create (ignore_conflicts) are not counted as inserted
+        """
+        bulk_create = EolZoomRegistrant.objects.bulk_create
 
-    @patch("requests.get")
+        def conflict_bulk_create(registrants, **kwargs):
+            # The second row conflicts and is silently ignored
+            return bulk_create(registrants[:1], **kwargs)
+
+        students = [
+            {'email': "email1", 'join_url': "join_url_1"},
+            {'email': "email2", 'join_url': "join_url_2"},
+        ]
+        with patch.object(EolZoomRegistrant.objects, 'bulk_create', side_effect=conflict_bulk_create):
+            result = views._submit_join_url(students, 'meeting_id', self.block_id, False)
+        self.assertEqual(EolZoomRegistrant.objects.filter(meeting_id='meeting_id').count(), 1)
+        self.assertEqual(result, {'inserted': 1, 'existing': 1})
+
+    @patch("eolzoom.views.get_user_access_token")
+    @patch("eolzoom.views.meeting_start_emails")
+    @patch("eolzoom.views.TaskProgress")
+    @patch("eolzoom.views.get_join_url")
+    @patch("eolzoom.views.set_registrant_status")
+    @patch("eolzoom.views._register_students_threads")
+    def test_register_meeting_users_delta(
+            self,
+            register_students_threads,
+            set_registrant_status,
+            get_join_url,
+            task_progress,
+            meeting_start_emails,
+            get_user_access_token):
+        """
+            Test only new students are registered and unenrolled students are cancelled
+        """
+        for email in ['registered@email.email', 'new@email.email']:
+            CourseEnrollmentFactory(
+                user=UserFactory(email=email),
+                course_id=self.course.id)
+        EolZoomRegistrant.objects.create(
+            meeting_id='meeting_id', email='registered@email.email', join_url='join_url_1')
+        EolZoomRegistrant.objects.create(
+            meeting_id='meeting_id', email='unenrolled@email.email', join_url='join_url_2')
+        set_registrant_status.side_effect = [{'success': 'cancelled'}]
+        get_join_url.side_effect = [[
+            {'email': 'registered@email.email', 'join_url': 'join_url_1'},
+            {'email': 'new@email.email', 'join_url': 'join_url_3'}]]
+        get_user_access_token.return_value = {'access_token': 'access_token'}
+        task_input = {
+            'user_meeting_id': self.user.id,
+            'meeting_id': 'meeting_id',
+            'block_id': self.block_id,
+            'email_notification': True,
+            'register_mode': 'threads',
+        }
+        views.register_meeting_users(None, None, self.course.id, task_input, 'registered')
+        get_user_access_token.assert_called_once_with(self.user, settings.EOLZOOM_TASK_ACCESS_TOKEN_MIN_TTL)
+
+        args = register_students_threads.call_args[0]
+        self.assertEqual([student.email for student in args[2]], ['new@email.email'])
+        self.assertEqual(
+            set_registrant_status.call_args[0][2], [{'email': 'unenrolled@email.email'}])
+        self.assertEqual(set_registrant_status.call_args[1]['action'], 'cancel')
+        self.assertEqual(
+            sorted(EolZoomRegistrant.objects.filter(
+                meeting_id='meeting_id').values_list('email', flat=True)),
+            ['new@email.email', 'registered@email.email'])
+        self.assertEqual(
+            sorted(email for call in meeting_start_emails.apply_async.call_args_list for email in call[1]['args'][1]),
+            ['new@email.email', 'registered@email.email'])
+
+    @patch("eolzoom.views.meeting_start_emails")
+    def test_send_meeting_start_emails(self, meeting_start_emails):
+        """
+            Test emails are queued by chunks in the email queue, spaced in time
+        """
+        emails = ['email{}'.format(i) for i in range(5)]
+        with self.settings(EOLZOOM_EMAIL_CHUNK_SIZE=2, EOLZOOM_EMAIL_CHUNK_INTERVAL=3):
+            views._send_meeting_start_emails(self.block_id, emails)
+        calls = [call[1] for call in meeting_start_emails.apply_async.call_args_list]
+        self.assertEqual([call['args'][1] for call in calls], [emails[0:2], emails[2:4], emails[4:]])
+        self.assertEqual([call['countdown'] for call in calls], [0, 3, 6])
+        self.assertEqual(calls[0]['queue'], settings.EOLZOOM_EMAIL_QUEUE)
+
+    @patch("eolzoom.signals.get_user_access_token")
+    @patch("eolzoom.signals.get_meeting_registrant")
+    @patch("eolzoom.signals.set_registrant_status")
+    def test_update_enrollment_registrant(self, set_registrant_status, get_meeting_registrant, get_user_access_token):
+        """
+            Test enrollment changes update registrants of registered restricted meetings
+            1. Meeting without registrants is skipped
+            2. Enrolled student is registered
+            3. Unenrolled student is cancelled
+        """
+        EolZoomMappingUserMeet.objects.create(
+            meeting_id="1234",
+            user=self.user,
+            title="I am a title",
+            restricted_access=True,
+            course_key=self.course.id,
+            usage_key=UsageKey.from_string(self.block_id),
+            scheduled_end=timezone.now() + datetime.timedelta(days=1))
+        get_user_access_token.return_value = {'access_token': 'access_token'}
+        signals.update_enrollment_registrant(self.aux_user.id, text_type(self.course.id), True)
+        self.assertEqual(get_meeting_registrant.call_count, 0)
+
+        EolZoomRegistrant.objects.create(meeting_id='1234', email='email1', join_url='url1')
+        get_meeting_registrant.return_value = {'registrant_id': 'registrant_id', 'join_url': 'url2'}
+        set_registrant_status.return_value = {'success': 'approved'}
+        signals.update_enrollment_registrant(self.aux_user.id, text_type(self.course.id), True)
+        registrant = EolZoomRegistrant.objects.get(meeting_id='1234', email=self.aux_user.email)
+        self.assertEqual(registrant.join_url, 'url2')
+        self.assertEqual(
+            set_registrant_status.call_args[0][2],
+            [{'id': 'registrant_id', 'email': self.aux_user.email}])
+
+        set_registrant_status.return_value = {'success': 'cancelled'}
+        signals.update_enrollment_registrant(self.aux_user.id, text_type(self.course.id), False)
+        self.assertEqual(set_registrant_status.call_args[1], {'action': 'cancel'})
+        self.assertFalse(EolZoomRegistrant.objects.filter(meeting_id='1234', email=self.aux_user.email).exists())
+
+    @patch("eolzoom.signals.get_user_access_token")
+    @patch("eolzoom.signals.get_meeting_registrant")
+    @patch("eolzoom.signals.set_registrant_status")
+    def test_update_enrollment_registrant_retry(self, set_registrant_status, get_meeting_registrant, get_user_access_token):
+        """
+            Test past meetings (or without scheduled end) are skipped and failed meetings are retried
+        """
+        now = timezone.now()
+        meetings = [
+            ("1234", now + datetime.timedelta(days=1), False, None),
+            ("5678", now - datetime.timedelta(days=1), False, None),
+            ("9012", None, False, None),
+            ("3456", None, True, now - datetime.timedelta(days=10))]
+        for meeting_id, scheduled_end, is_live, started_at in meetings:
+            EolZoomMappingUserMeet.objects.create(
+                meeting_id=meeting_id,
+                user=self.user,
+                title="I am a title",
+                restricted_access=True,
+                course_key=self.course.id,
+                usage_key=UsageKey.from_string(self.block_id),
+                scheduled_end=scheduled_end,
+                is_live=is_live,
+                started_at=started_at)
+            EolZoomRegistrant.objects.create(meeting_id=meeting_id, email='email1', join_url='url1')
+        get_user_access_token.return_value = {'access_token': 'access_token'}
+        get_meeting_registrant.return_value = {'error': 'zoom error'}
+        with patch.object(signals.update_enrollment_registrant, 'retry', side_effect=Retry()) as retry:
+            with self.assertRaises(Retry):
+                signals.update_enrollment_registrant(self.aux_user.id, text_type(self.course.id), True)
+        self.assertEqual(get_meeting_registrant.call_count, 1)
+        self.assertEqual(get_meeting_registrant.call_args[0][0], "1234")
+        self.assertEqual(retry.call_args[1]['kwargs']['meeting_ids'], ["1234"])
+
+    @patch("eolzoom.http_client.get")
     def test_get_join_url(self, get):
         """
             Test get join url (set of registrants with their url).
@@ -980,8 +1488,9 @@ class TestEolZoomAPI(UrlResetMixin, ModuleStoreTestCase):
         """
             Test join url:
             1. Meeting not started/created
-            2. User not registered
-            3. User registered
+            2. Meeting with registrants but not started
+            3. User not registered
+            4. User registered
         """
         get_data = {
             'meeting_id': 'meeting_id'
@@ -996,6 +1505,18 @@ class TestEolZoomAPI(UrlResetMixin, ModuleStoreTestCase):
             email='email1',
             join_url='url1'
         )
+        user_model = EolZoomMappingUserMeet.objects.create(
+            meeting_id="meeting_id",
+            user=self.aux_user,
+            title="I am a title",
+            restricted_access=True)
+        response = self.client.get(reverse('get_student_join_url'), get_data)
+        self.assertEqual(
+            response.json(), {
+                'status': False, 'error_type': 'NOT_STARTED'})
+
+        user_model.is_live = True
+        user_model.save()
         response = self.client.get(reverse('get_student_join_url'), get_data)
         self.assertEqual(
             response.json(), {
@@ -1009,12 +1530,79 @@ class TestEolZoomAPI(UrlResetMixin, ModuleStoreTestCase):
         response = self.client.get(reverse('get_student_join_url'), get_data)
         self.assertEqual(response.json(), {'status': True, 'join_url': 'url2'})
 
+    @patch("eolzoom.views.cache", LocMemCache('eolzoom_join_url_tests', {}))
+    def test_get_student_join_url_cached(self):
+        """
+            Test join url is answered from cache after registrants are submitted
+        """
+        EolZoomMappingUserMeet.objects.create(
+            meeting_id="meeting_id",
+            user=self.aux_user,
+            title="I am a title",
+            restricted_access=True,
+            is_live=True)
+        views._submit_join_url(
+            [{'email': self.user.email, 'join_url': 'url1'}], 'meeting_id', self.block_id, False)
+        request = TestRequest()
+        request.method = 'GET'
+        request.user = self.user
+        request.GET = {'meeting_id': 'meeting_id'}
+        with self.assertNumQueries(0):
+            response = views.get_student_join_url(request)
+        self.assertEqual(json.loads(response.content.decode()), {'status': True, 'join_url': 'url1'})
+
+        request.user = self.aux_user
+        with self.assertNumQueries(2):
+            views.get_student_join_url(request)
+        with self.assertNumQueries(1):
+            response = views.get_student_join_url(request)
+        self.assertEqual(
+            json.loads(response.content.decode()), {'status': False, 'error_type': 'NOT_FOUND'})
+
+    @override_settings(EOLZOOM_JOIN_URL_RETRY_AFTER=3)
+    @patch("eolzoom.views.cache", LocMemCache('eolzoom_wait_tests', {}))
+    @patch("eolzoom.views.time.sleep")
+    def test_wait_student_join_url(self, sleep):
+        """
+            Test wait join url (answered right away, the student polls):
+            1. Meeting not started
+            2. Registration running: PENDING with retry_after
+            3. Join url is saved
+            4. Registration ended without join url
+        """
+        get_data = {
+            'meeting_id': 'meeting_id'
+        }
+        views.set_join_urls_pending('meeting_id', True)
+        response = self.client.get(reverse('wait_student_join_url'), get_data)
+        self.assertEqual(
+            response.json(), {
+                'status': False, 'error_type': 'NOT_STARTED'})
+
+        views.set_cached_meeting_live('meeting_id', True)
+        response = self.client.get(reverse('wait_student_join_url'), get_data)
+        self.assertEqual(
+            response.json(), {
+                'status': False, 'error_type': 'PENDING', 'retry_after': 3})
+
+        views._submit_join_url(
+            [{'email': self.user.email, 'join_url': 'url1'}], 'meeting_id', self.block_id, False)
+        response = self.client.get(reverse('wait_student_join_url'), get_data)
+        self.assertEqual(response.json(), {'status': True, 'join_url': 'url1'})
+
+        views.set_join_urls_pending('meeting_id', False)
+        response = self.client_2.get(reverse('wait_student_join_url'), get_data)
+        self.assertEqual(
+            response.json(), {
+                'status': False, 'error_type': 'NOT_FOUND'})
+        sleep.assert_not_called()
+
     @override_settings(EOLZOOM_EVENT_AUTHORIZATION = '1234567890asdfgh')
     @patch("eolzoom.views.get_join_url")
     @patch("eolzoom.views.meeting_registrant")
     @patch('eolzoom.utils_youtube.check_status_live_youtube')
-    @patch("requests.patch")
-    @patch("requests.post")
+    @patch("eolzoom.http_client.patch")
+    @patch("eolzoom.http_client.post")
     def test_event_zoom_private(self, post, patch, check_yt, meeting_registrant, get_join_url):
         """
             Test event_zoom_youtube normal process  
@@ -1026,7 +1614,12 @@ class TestEolZoomAPI(UrlResetMixin, ModuleStoreTestCase):
             "expires_in": 3599,
             "scope": "user:read:admin"
         }
+        # Access token of meeting.started event and register task
         post.side_effect = [
+            namedtuple(
+                "Request", [
+                    "status_code", "json"])(
+                200, lambda:response),
             namedtuple(
                 "Request", [
                     "status_code", "json"])(
@@ -1061,10 +1654,9 @@ class TestEolZoomAPI(UrlResetMixin, ModuleStoreTestCase):
             ],
         }]
         check_yt.return_value = True
-        EolZoomMappingUserMeet.objects.create(
+        user_model = EolZoomMappingUserMeet.objects.create(
             meeting_id="1234", 
             user=self.user, 
-            broadcast_ids="youtube_id", 
             title="I am a title", 
             is_enabled=True,
             restricted_access=True,
@@ -1072,6 +1664,7 @@ class TestEolZoomAPI(UrlResetMixin, ModuleStoreTestCase):
             usage_key=UsageKey.from_string(self.block_id),
             email_notification=True
             )
+        EolZoomBroadcast.objects.create(meeting=user_model, broadcast_id="youtube_id")
         request = TestRequest()
         request.method = 'POST'
         data = json.dumps(post_data).encode('utf-8')
@@ -1081,11 +1674,12 @@ class TestEolZoomAPI(UrlResetMixin, ModuleStoreTestCase):
         request.params = post_data
         result = views.event_zoom(request)
         self.assertEqual(result.status_code, 200)
+        self.assertEqual(EolZoomEventInbox.objects.get(meeting_id="1234").status, EolZoomEventInbox.PROCESSED)
 
     @override_settings(EOLZOOM_EVENT_AUTHORIZATION = '1234567890asdfgh')
     @patch('eolzoom.utils_youtube.check_status_live_youtube')
-    @patch("requests.patch")
-    @patch("requests.post")
+    @patch("eolzoom.http_client.patch")
+    @patch("eolzoom.http_client.post")
     def test_event_zoom_public(self, post, patch, check_yt):
         """
             Test event_zoom_youtube normal process  
@@ -1115,10 +1709,9 @@ class TestEolZoomAPI(UrlResetMixin, ModuleStoreTestCase):
                 }
             }
         check_yt.return_value = True
-        EolZoomMappingUserMeet.objects.create(
+        user_model = EolZoomMappingUserMeet.objects.create(
             meeting_id="1234", 
             user=self.user, 
-            broadcast_ids="youtube_id", 
             title="I am a title", 
             is_enabled=True,
             restricted_access=False,
@@ -1126,6 +1719,7 @@ class TestEolZoomAPI(UrlResetMixin, ModuleStoreTestCase):
             usage_key=UsageKey.from_string(self.block_id),
             email_notification=True
             )
+        EolZoomBroadcast.objects.create(meeting=user_model, broadcast_id="youtube_id")
         request = TestRequest()
         request.method = 'POST'
         data = json.dumps(post_data).encode('utf-8')
@@ -1135,6 +1729,7 @@ class TestEolZoomAPI(UrlResetMixin, ModuleStoreTestCase):
         request.params = post_data
         result = views.event_zoom(request)
         self.assertEqual(result.status_code, 200)
+        self.assertEqual(EolZoomEventInbox.objects.get(meeting_id="1234").status, EolZoomEventInbox.PROCESSED)
 
     @override_settings(EOLZOOM_EVENT_AUTHORIZATION = '1234567890asdfgh')
     def test_event_zoom_wrong_authorization(self):
@@ -1159,8 +1754,11 @@ class TestEolZoomAPI(UrlResetMixin, ModuleStoreTestCase):
         request.user = AnonymousUser()
         request.headers = headers
         request.params = post_data
-        result = views.event_zoom(request)
+        with self.assertLogs('eolzoom.utils_youtube', level='ERROR') as logs:
+            result = views.event_zoom(request)
         self.assertEqual(result.status_code, 400)
+        # The authorization secret is not logged
+        self.assertNotIn('1234567890asdfgh', '\n'.join(logs.output))
 
     def test_event_zoom_not_authorization(self):
         """
@@ -1190,11 +1788,11 @@ class TestEolZoomAPI(UrlResetMixin, ModuleStoreTestCase):
     @override_settings(EOLZOOM_EVENT_AUTHORIZATION = '1234567890asdfgh')
     def test_event_zoom_wrong_event(self):
         """
-            Test event_zoom if event is not 'meeting.started'
+            Test event_zoom if event doesn't have handler (ignored)
         """
         headers={'Authorization': '1234567890asdfgh'}
         post_data = {
-            "event": "meeting.ended",
+            "event": "meeting.deleted",
             "payload": {
                 "account_id": "o8KK_AAACq6BBEyA70CA",
                 "object": {
@@ -1211,7 +1809,8 @@ class TestEolZoomAPI(UrlResetMixin, ModuleStoreTestCase):
         request.headers = headers
         request.params = post_data
         result = views.event_zoom(request)
-        self.assertEqual(result.status_code, 400)
+        self.assertEqual(result.status_code, 200)
+        self.assertFalse(EolZoomEventInbox.objects.filter(meeting_id="1234").exists())
 
     @override_settings(EOLZOOM_EVENT_AUTHORIZATION = '1234567890asdfgh')
     def test_event_zoom_meet_not_exists(self):
@@ -1238,10 +1837,11 @@ class TestEolZoomAPI(UrlResetMixin, ModuleStoreTestCase):
         request.headers = headers
         request.params = post_data
         result = views.event_zoom(request)
-        self.assertEqual(result.status_code, 400)
+        self.assertEqual(result.status_code, 200)
+        self.assertEqual(EolZoomEventInbox.objects.get(meeting_id="1234").status, EolZoomEventInbox.FAILED)
 
     @override_settings(EOLZOOM_EVENT_AUTHORIZATION = '1234567890asdfgh')
-    @patch("requests.post")
+    @patch("eolzoom.http_client.post")
     def test_event_zoom_fail_access_token(self, post):
         """
             Test event_zoom if fail get access token from zoom
@@ -1279,12 +1879,13 @@ class TestEolZoomAPI(UrlResetMixin, ModuleStoreTestCase):
         request.headers = headers
         request.params = post_data
         result = views.event_zoom(request)
-        self.assertEqual(result.status_code, 400)
+        self.assertEqual(result.status_code, 200)
+        self.assertEqual(EolZoomEventInbox.objects.get(meeting_id="1234").status, EolZoomEventInbox.FAILED)
 
     @override_settings(EOLZOOM_EVENT_AUTHORIZATION = '1234567890asdfgh')
     @patch('eolzoom.utils_youtube.check_status_live_youtube')
-    @patch("requests.patch")
-    @patch("requests.post")
+    @patch("eolzoom.http_client.patch")
+    @patch("eolzoom.http_client.post")
     def test_event_zoom_youtube_fail_start_live(self, post, patch, check_yt):
         """
             Test event_zoom if fail update status livestream in zoom meeting 
@@ -1314,10 +1915,9 @@ class TestEolZoomAPI(UrlResetMixin, ModuleStoreTestCase):
                     }
                 }
             }
-        EolZoomMappingUserMeet.objects.create(
+        user_model = EolZoomMappingUserMeet.objects.create(
             meeting_id="1234", 
             user=self.user, 
-            broadcast_ids="youtube_id", 
             title="I am a title", 
             is_enabled=True,
             restricted_access=False,
@@ -1325,6 +1925,7 @@ class TestEolZoomAPI(UrlResetMixin, ModuleStoreTestCase):
             usage_key=UsageKey.from_string(self.block_id),
             email_notification=False
             )
+        EolZoomBroadcast.objects.create(meeting=user_model, broadcast_id="youtube_id")
         request = TestRequest()
         request.method = 'POST'
         data = json.dumps(post_data).encode('utf-8')
@@ -1333,7 +1934,355 @@ class TestEolZoomAPI(UrlResetMixin, ModuleStoreTestCase):
         request.headers = headers
         request.params = post_data
         result = views.event_zoom(request)
-        self.assertEqual(result.status_code, 400)
+        self.assertEqual(result.status_code, 200)
+        self.assertEqual(EolZoomEventInbox.objects.get(meeting_id="1234").status, EolZoomEventInbox.FAILED)
+
+    @override_settings(EOLZOOM_EVENT_AUTHORIZATION = '1234567890asdfgh')
+    @patch("eolzoom.views.process_event_inbox.apply_async")
+    def test_event_zoom_inbox(self, process_event_inbox_delay):
+        """
+            Test event_zoom save the event and answer without processing it
+            and the event is processed only once
+        """
+        post_data = {
+            "event": "meeting.started",
+            "payload": {
+                "account_id": "o8KK_AAACq6BBEyA70CA",
+                "object": {
+                    "id": "1234",
+                    "host_id": "uLoRgfbbTayCX6r2Q_qQsQ",
+                    }
+                }
+            }
+        request = TestRequest()
+        request.method = 'POST'
+        request.body = json.dumps(post_data).encode('utf-8')
+        request.user = AnonymousUser()
+        request.headers = {'Authorization': '1234567890asdfgh'}
+        result = views.event_zoom(request)
+        self.assertEqual(result.status_code, 200)
+        inbox = EolZoomEventInbox.objects.get(meeting_id="1234")
+        self.assertEqual(inbox.status, EolZoomEventInbox.PENDING)
+        self.assertEqual(json.loads(inbox.payload), post_data)
+        process_event_inbox_delay.assert_called_once_with(args=(inbox.id,), queue='edx.lms.core.high')
+
+        meeting_started_event = Mock(return_value=True)
+        with patch.dict(webhooks.EVENT_HANDLERS, {'meeting.started': meeting_started_event}):
+            self.assertTrue(views.process_event_inbox(inbox.id))
+            self.assertFalse(views.process_event_inbox(inbox.id))
+        self.assertEqual(meeting_started_event.call_count, 1)
+        self.assertEqual(meeting_started_event.call_args[0][0].meeting_id, "1234")
+        self.assertEqual(
+            EolZoomEventInbox.objects.get(id=inbox.id).status, EolZoomEventInbox.PROCESSED)
+
+    @patch("eolzoom.views.process_event_inbox.apply_async")
+    def test_requeue_event_inbox(self, process_event_inbox_delay):
+        """
+            Test stale pending and failed events are queued again (max EOLZOOM_EVENT_MAX_ATTEMPTS)
+        """
+        def create_inbox(status, attempts, minutes_ago):
+            inbox = EolZoomEventInbox.objects.create(
+                event="meeting.started", meeting_id="1234", payload="{}", status=status, attempts=attempts)
+            EolZoomEventInbox.objects.filter(id=inbox.id).update(
+                created=timezone.now() - datetime.timedelta(minutes=minutes_ago))
+            return inbox.id
+
+        stale = create_inbox(EolZoomEventInbox.PENDING, 0, 60)
+        create_inbox(EolZoomEventInbox.PENDING, 0, 1)
+        failed = create_inbox(EolZoomEventInbox.FAILED, 1, 1)
+        create_inbox(EolZoomEventInbox.FAILED, settings.EOLZOOM_EVENT_MAX_ATTEMPTS, 60)
+        create_inbox(EolZoomEventInbox.PROCESSED, 1, 60)
+        participant = create_inbox(EolZoomEventInbox.PENDING, 0, 60)
+        EolZoomEventInbox.objects.filter(id=participant).update(event="meeting.participant_joined")
+        self.assertEqual(views.requeue_event_inbox(), 3)
+        self.assertEqual(
+            [call[1] for call in process_event_inbox_delay.call_args_list], [
+                {'args': (stale,), 'queue': 'edx.lms.core.high'},
+                {'args': (failed,), 'queue': 'edx.lms.core.high'},
+                {'args': (participant,), 'queue': settings.EOLZOOM_EVENT_LOW_PRIORITY_QUEUE}])
+        self.assertEqual(EolZoomEventInbox.objects.get(id=failed).status, EolZoomEventInbox.PENDING)
+
+    @override_settings(EOLZOOM_EVENT_RETENTION=24 * 60 * 60)
+    def test_purge_event_inbox(self):
+        """
+            Test old processed events and failed events without attempts left are deleted
+        """
+        def create_inbox(status, attempts, hours_ago):
+            inbox = EolZoomEventInbox.objects.create(
+                event="meeting.participant_joined", meeting_id="1234", payload="{}", status=status, attempts=attempts)
+            EolZoomEventInbox.objects.filter(id=inbox.id).update(
+                created=timezone.now() - datetime.timedelta(hours=hours_ago))
+            return inbox.id
+
+        create_inbox(EolZoomEventInbox.PROCESSED, 1, 48)
+        create_inbox(EolZoomEventInbox.FAILED, settings.EOLZOOM_EVENT_MAX_ATTEMPTS, 48)
+        kept = [
+            create_inbox(EolZoomEventInbox.PROCESSED, 1, 1),
+            create_inbox(EolZoomEventInbox.FAILED, 1, 48),
+            create_inbox(EolZoomEventInbox.PENDING, 0, 48)]
+        self.assertEqual(views.purge_event_inbox(), 2)
+        self.assertEqual(
+            sorted(EolZoomEventInbox.objects.values_list('id', flat=True)), kept)
+
+    def test_process_event_inbox_retry(self):
+        """
+            Test unexpected errors processing an event are retried and then the event is failed
+        """
+        inbox = EolZoomEventInbox.objects.create(
+            event="meeting.started",
+            meeting_id="1234",
+            payload=json.dumps({"event": "meeting.started", "payload": {"object": {"id": "1234"}}}))
+        meeting_started_event = Mock(side_effect=Exception('database error'))
+        with patch.dict(webhooks.EVENT_HANDLERS, {'meeting.started': meeting_started_event}):
+            views.process_event_inbox.apply(args=(inbox.id,))
+        inbox = EolZoomEventInbox.objects.get(id=inbox.id)
+        self.assertEqual(meeting_started_event.call_count, views.EVENT_MAX_RETRIES + 1)
+        self.assertEqual(inbox.attempts, views.EVENT_MAX_RETRIES + 1)
+        self.assertEqual(inbox.status, EolZoomEventInbox.FAILED)
+
+    @patch('eolzoom.utils_youtube.start_live_youtube')
+    @patch('eolzoom.views.get_user_access_token')
+    @patch('eolzoom.views.start_meeting_event')
+    def test_meeting_started_event_steps(self, start_meeting_event, get_user_access_token, start_live_youtube):
+        """
+            Test a failed step of meeting.started is repeated without repeating the done steps (students emails)
+        """
+        EolZoomMappingUserMeet.objects.create(
+            meeting_id="1234",
+            user=self.user,
+            title="I am a title",
+            is_enabled=True,
+            restricted_access=True,
+            course_key=self.course.id,
+            usage_key=UsageKey.from_string(self.block_id),
+            email_notification=True)
+        get_user_access_token.return_value = {'access_token': '1234'}
+        start_live_youtube.side_effect = [None, {'live': 'ok'}]
+        inbox = EolZoomEventInbox.objects.create(
+            event="meeting.started",
+            meeting_id="1234",
+            payload=json.dumps({"event": "meeting.started", "payload": {"object": {"id": "1234"}}}))
+        self.assertFalse(views.process_event_inbox(inbox.id))
+        inbox.refresh_from_db()
+        self.assertEqual(inbox.status, EolZoomEventInbox.FAILED)
+        self.assertEqual(inbox.steps, 'live,students')
+
+        self.assertEqual(views.requeue_event_inbox(), 1)
+        inbox.refresh_from_db()
+        self.assertEqual(inbox.status, EolZoomEventInbox.PROCESSED)
+        self.assertEqual(inbox.steps, 'live,students,youtube')
+        self.assertEqual(start_meeting_event.call_count, 1)
+        self.assertEqual(start_live_youtube.call_count, 2)
+
+    @override_settings(EOLZOOM_EVENT_AUTHORIZATION = '1234567890asdfgh')
+    @patch("eolzoom.views.process_event_inbox.apply_async")
+    def test_event_zoom_duplicated(self, process_event_inbox_delay):
+        """
+            Test repeated deliveries of the same event are saved and processed once
+        """
+        post_data = {
+            "event": "meeting.started",
+            "payload": {
+                "account_id": "o8KK_AAACq6BBEyA70CA",
+                "object": {
+                    "id": "1234",
+                    "uuid": "4444AAAiAAAAAiAiAiiAii==",
+                    "host_id": "uLoRgfbbTayCX6r2Q_qQsQ",
+                    }
+                }
+            }
+        request = TestRequest()
+        request.method = 'POST'
+        request.body = json.dumps(post_data).encode('utf-8')
+        request.user = AnonymousUser()
+        request.headers = {'Authorization': '1234567890asdfgh'}
+        for i in range(3):
+            result = views.event_zoom(request)
+            self.assertEqual(result.status_code, 200)
+        self.assertEqual(EolZoomEventInbox.objects.filter(meeting_id="1234").count(), 1)
+        self.assertEqual(process_event_inbox_delay.call_count, 1)
+
+        post_data['payload']['object']['uuid'] = "5555AAAiAAAAAiAiAiiAii=="
+        request.body = json.dumps(post_data).encode('utf-8')
+        result = views.event_zoom(request)
+        self.assertEqual(result.status_code, 200)
+        self.assertEqual(process_event_inbox_delay.call_count, 2)
+
+    @override_settings(EOLZOOM_EVENT_AUTHORIZATION = '1234567890asdfgh')
+    @patch("eolzoom.views.process_event_inbox.apply_async")
+    def test_event_zoom_queue_error(self, process_event_inbox_delay):
+        """
+            Test the event isn't marked as received if it can't be queued,
+            so the next delivery of Zoom is accepted
+        """
+        post_data = {
+            "event": "meeting.started",
+            "payload": {
+                "object": {
+                    "id": "1234",
+                    "uuid": "4444AAAiAAAAAiAiAiiAii==",
+                    }
+                }
+            }
+        request = TestRequest()
+        request.method = 'POST'
+        request.body = json.dumps(post_data).encode('utf-8')
+        request.user = AnonymousUser()
+        request.headers = {'Authorization': '1234567890asdfgh'}
+        process_event_inbox_delay.side_effect = [Exception('broker error'), None]
+        result = views.event_zoom(request)
+        self.assertEqual(result.status_code, 500)
+        self.assertFalse(EolZoomEventInbox.objects.filter(meeting_id="1234").exists())
+
+        result = views.event_zoom(request)
+        self.assertEqual(result.status_code, 200)
+        self.assertEqual(EolZoomEventInbox.objects.get(meeting_id="1234").dedup_key, "4444AAAiAAAAAiAiAiiAii==")
+        self.assertEqual(process_event_inbox_delay.call_count, 2)
+
+    @override_settings(EOLZOOM_EVENT_AUTHORIZATION = '1234567890asdfgh')
+    def test_event_zoom_malformed(self):
+        """
+            Test event_zoom if body is not a valid zoom event
+        """
+        bodies = [
+            b'not a json',
+            b'["meeting.started"]',
+            json.dumps({"event": "meeting.started"}).encode('utf-8'),
+            json.dumps({"event": "meeting.started", "payload": {"object": {}}}).encode('utf-8'),
+            json.dumps({"event": "meeting.started", "payload": {"object": {"id": None}}}).encode('utf-8'),
+            json.dumps({"payload": {"object": {"id": "1234"}}}).encode('utf-8'),
+        ]
+        for body in bodies:
+            request = TestRequest()
+            request.method = 'POST'
+            request.body = body
+            request.user = AnonymousUser()
+            request.headers = {'Authorization': '1234567890asdfgh'}
+            result = views.event_zoom(request)
+            self.assertEqual(result.status_code, 400)
+        self.assertFalse(EolZoomEventInbox.objects.exists())
+
+    def test_parse_zoom_event(self):
+        """
+            Test parse a zoom event
+        """
+        event = webhooks.parse_zoom_event(json.dumps({
+            "event": "meeting.started",
+            "event_ts": 1626230691572,
+            "payload": {"object": {"id": 1234, "uuid": "4444AAAiAAAAAiAiAiiAii=="}}}).encode('utf-8'))
+        self.assertEqual(event.event, "meeting.started")
+        self.assertEqual(event.meeting_id, "1234")
+        self.assertEqual(event.meeting_uuid, "4444AAAiAAAAAiAiAiiAii==")
+        self.assertEqual(event.event_ts, 1626230691572)
+        self.assertEqual(event.get_dedup_key(), "4444AAAiAAAAAiAiAiiAii==")
+        event = webhooks.parse_zoom_event(json.dumps({
+            "event": "meeting.started",
+            "event_ts": 1626230691572,
+            "payload": {"object": {"id": 1234}}}))
+        self.assertEqual(event.get_dedup_key(), "1234:1626230691572")
+        event = webhooks.parse_zoom_event(json.dumps({
+            "event": "meeting.started",
+            "payload": {"object": {"id": 1234}}}))
+        self.assertIsNone(event.get_dedup_key())
+        with self.assertRaises(webhooks.InvalidZoomEvent):
+            webhooks.parse_zoom_event(json.dumps({
+                "event": "meeting.started",
+                "payload": {"object": {"id": "1234", "uuid": 4444}}}))
+
+    @patch('eolzoom.utils_youtube.stop_live_youtube')
+    def test_meeting_status_events(self, stop_live_youtube):
+        """
+            Test meeting status handlers: started, participant joined/left, ended and recording completed
+        """
+        user_model = EolZoomMappingUserMeet.objects.create(
+            meeting_id="1234",
+            user=self.user,
+            title="I am a title",
+            is_enabled=True)
+        EolZoomBroadcast.objects.create(meeting=user_model, broadcast_id="youtube_id")
+
+        def process(event, participant=None, **kwargs):
+            meeting = {"id": "1234", "uuid": "4444AAAiAAAAAiAiAiiAii=="}
+            meeting.update(kwargs)
+            if participant is not None:
+                meeting['participant'] = participant
+            inbox = EolZoomEventInbox.objects.create(
+                event=event,
+                meeting_id="1234",
+                payload=json.dumps({"event": event, "payload": {"object": meeting}}))
+            return views.process_event_inbox(inbox.id)
+
+        # participant event processed before meeting.started is kept
+        self.assertTrue(process("meeting.participant_joined", {"user_id": "1", "join_time": "2021-01-01T10:00:00Z"}))
+        views.set_meeting_live("1234", "4444AAAiAAAAAiAiAiiAii==")
+        user_model.refresh_from_db()
+        self.assertEqual(user_model.participants_count, 1)
+        self.assertEqual(user_model.attendance_count, 1)
+        self.assertTrue(process("meeting.participant_joined", {"user_id": "2", "join_time": "2021-01-01T10:01:00Z"}))
+        self.assertTrue(process("meeting.participant_left", {"user_id": "1", "leave_time": "2021-01-01T10:02:00Z"}))
+        # old event out of order is ignored
+        self.assertTrue(process("meeting.participant_joined", {"user_id": "1", "join_time": "2021-01-01T10:00:00Z"}))
+        user_model.refresh_from_db()
+        self.assertTrue(user_model.is_live)
+        self.assertEqual(user_model.participants_count, 1)
+        self.assertEqual(user_model.attendance_count, 2)
+        # rejoin is not counted twice in attendance
+        self.assertTrue(process("meeting.participant_joined", {"user_id": "1", "join_time": "2021-01-01T10:03:00Z"}))
+        user_model.refresh_from_db()
+        self.assertEqual(user_model.participants_count, 2)
+        self.assertEqual(user_model.attendance_count, 2)
+        self.assertEqual(EolZoomParticipant.objects.filter(meeting_id="1234").count(), 2)
+
+        # late ended event of a previous instance
+        self.assertTrue(process("meeting.ended", uuid="3333AAAiAAAAAiAiAiiAii=="))
+        user_model.refresh_from_db()
+        self.assertTrue(user_model.is_live)
+        stop_live_youtube.assert_not_called()
+
+        self.assertTrue(process("meeting.ended"))
+        user_model.refresh_from_db()
+        self.assertFalse(user_model.is_live)
+        self.assertIsNotNone(user_model.ended_at)
+        self.assertEqual(user_model.participants_count, 0)
+        self.assertEqual(user_model.attendance_count, 2)
+        stop_live_youtube.assert_called_once()
+
+        self.assertTrue(process("recording.completed", share_url="https://zoom.us/rec/share/1234"))
+        user_model.refresh_from_db()
+        self.assertEqual(user_model.recording_url, "https://zoom.us/rec/share/1234")
+
+        self.assertFalse(process("meeting.participant_joined", {"user_id": "1"}, id="9999"))
+
+    @patch('eolzoom.utils_youtube.create_youtube_object')
+    def test_broadcast_history_status(self, create_youtube_object):
+        """
+            Test check_status_live_youtube and stop_live_youtube use the last broadcast
+            and save its lifeCycleStatus
+        """
+        user_model = EolZoomMappingUserMeet.objects.create(
+            meeting_id="1234",
+            user=self.user,
+            title="I am a title",
+            is_enabled=True)
+        self.assertFalse(utils_youtube.check_status_live_youtube(user_model))
+        self.assertFalse(utils_youtube.stop_live_youtube(user_model))
+        create_youtube_object.assert_not_called()
+
+        EolZoomBroadcast.objects.create(meeting=user_model, broadcast_id="youtube_id")
+        EolZoomBroadcast.objects.create(meeting=user_model, broadcast_id="youtube_id_2")
+        youtube = create_youtube_object.return_value
+        youtube.liveBroadcasts.return_value.list.return_value.execute.return_value = {
+            'items': [{'id': 'youtube_id_2', 'status': {'lifeCycleStatus': 'ready'}}]
+        }
+        self.assertTrue(utils_youtube.check_status_live_youtube(user_model))
+        youtube.liveBroadcasts.return_value.list.assert_called_with(part="id, status", id="youtube_id_2")
+        self.assertEqual(EolZoomBroadcast.objects.get(broadcast_id="youtube_id_2").status, "ready")
+
+        self.assertTrue(utils_youtube.stop_live_youtube(user_model))
+        youtube.liveBroadcasts.return_value.transition.assert_called_with(
+            broadcastStatus="complete", id="youtube_id_2", part="id,status")
+        self.assertEqual(EolZoomBroadcast.objects.get(broadcast_id="youtube_id_2").status, "complete")
+        self.assertEqual(EolZoomBroadcast.objects.get(broadcast_id="youtube_id").status, "created")
 
     def test_event_zoom_get(self):
         """
@@ -1347,8 +2296,8 @@ class TestEolZoomAPI(UrlResetMixin, ModuleStoreTestCase):
     @override_settings(EOLZOOM_EVENT_AUTHORIZATION = '1234567890asdfgh')
     @patch('eolzoom.utils_youtube.create_live_in_youtube')
     @patch('eolzoom.utils_youtube.check_status_live_youtube')
-    @patch("requests.patch")
-    @patch("requests.post")
+    @patch("eolzoom.http_client.patch")
+    @patch("eolzoom.http_client.post")
     def test_event_zoom_youtube_re_start(self, post, patch, check_yt, stream_dict):
         """
             Test event_zoom(youtube) normal process if meeting is re open
@@ -1387,10 +2336,9 @@ class TestEolZoomAPI(UrlResetMixin, ModuleStoreTestCase):
                     }
                 }
             }
-        EolZoomMappingUserMeet.objects.create(
+        user_model = EolZoomMappingUserMeet.objects.create(
             meeting_id="1234", 
             user=self.user, 
-            broadcast_ids="youtube_id", 
             title="I am a title", 
             is_enabled=True,
             restricted_access=False,
@@ -1398,6 +2346,7 @@ class TestEolZoomAPI(UrlResetMixin, ModuleStoreTestCase):
             usage_key=UsageKey.from_string(self.block_id),
             email_notification=False
             )
+        EolZoomBroadcast.objects.create(meeting=user_model, broadcast_id="youtube_id")
         request = TestRequest()
         request.method = 'POST'
         data = json.dumps(post_data).encode('utf-8')
@@ -1408,11 +2357,14 @@ class TestEolZoomAPI(UrlResetMixin, ModuleStoreTestCase):
         result = views.event_zoom(request)
         user_model = EolZoomMappingUserMeet.objects.get(meeting_id="1234", user=self.user, is_enabled=True)
         self.assertEqual(result.status_code, 200)
-        self.assertEqual(user_model.broadcast_ids, "youtube_id youtube_id_2")
+        self.assertEqual(EolZoomEventInbox.objects.get(meeting_id="1234").status, EolZoomEventInbox.PROCESSED)
+        self.assertEqual(
+            list(user_model.broadcasts.order_by('created', 'id').values_list('broadcast_id', flat=True)),
+            ["youtube_id", "youtube_id_2"])
 
     @override_settings(EOLZOOM_EVENT_AUTHORIZATION = '1234567890asdfgh')
     @patch('eolzoom.utils_youtube.check_status_live_youtube')
-    @patch("requests.post")
+    @patch("eolzoom.http_client.post")
     def test_event_zoom_youtube_re_start_fail_check(self, post, check_yt):
         """
             Test event_zoom_youtube if meeting is re open and fail in check_status_live_youtube
@@ -1441,10 +2393,9 @@ class TestEolZoomAPI(UrlResetMixin, ModuleStoreTestCase):
                     }
                 }
             }
-        EolZoomMappingUserMeet.objects.create(
+        user_model = EolZoomMappingUserMeet.objects.create(
             meeting_id="1234", 
             user=self.user, 
-            broadcast_ids="youtube_id", 
             title="I am a title", 
             is_enabled=True,
             restricted_access=False,
@@ -1452,6 +2403,7 @@ class TestEolZoomAPI(UrlResetMixin, ModuleStoreTestCase):
             usage_key=UsageKey.from_string(self.block_id),
             email_notification=False
             )
+        EolZoomBroadcast.objects.create(meeting=user_model, broadcast_id="youtube_id")
         request = TestRequest()
         request.method = 'POST'
         data = json.dumps(post_data).encode('utf-8')
@@ -1460,12 +2412,13 @@ class TestEolZoomAPI(UrlResetMixin, ModuleStoreTestCase):
         request.headers = headers
         request.params = post_data
         result = views.event_zoom(request)
-        self.assertEqual(result.status_code, 400)
+        self.assertEqual(result.status_code, 200)
+        self.assertEqual(EolZoomEventInbox.objects.get(meeting_id="1234").status, EolZoomEventInbox.FAILED)
 
     @override_settings(EOLZOOM_EVENT_AUTHORIZATION = '1234567890asdfgh')
     @patch('eolzoom.utils_youtube.create_live_in_youtube')
     @patch('eolzoom.utils_youtube.check_status_live_youtube')
-    @patch("requests.post")
+    @patch("eolzoom.http_client.post")
     def test_event_zoom_youtube_re_start_fail_create(self, post, check_yt, stream_dict):
         """
             Test event_zoom(youtube) if meeting is re open and fail in create new live
@@ -1502,10 +2455,9 @@ class TestEolZoomAPI(UrlResetMixin, ModuleStoreTestCase):
                     }
                 }
             }
-        EolZoomMappingUserMeet.objects.create(
+        user_model = EolZoomMappingUserMeet.objects.create(
             meeting_id="1234", 
             user=self.user, 
-            broadcast_ids="youtube_id", 
             title="I am a title", 
             is_enabled=True,
             restricted_access=False,
@@ -1513,6 +2465,7 @@ class TestEolZoomAPI(UrlResetMixin, ModuleStoreTestCase):
             usage_key=UsageKey.from_string(self.block_id),
             email_notification=False
             )
+        EolZoomBroadcast.objects.create(meeting=user_model, broadcast_id="youtube_id")
         request = TestRequest()
         request.method = 'POST'
         data = json.dumps(post_data).encode('utf-8')
@@ -1521,13 +2474,14 @@ class TestEolZoomAPI(UrlResetMixin, ModuleStoreTestCase):
         request.headers = headers
         request.params = post_data
         result = views.event_zoom(request)
-        self.assertEqual(result.status_code, 400)
+        self.assertEqual(result.status_code, 200)
+        self.assertEqual(EolZoomEventInbox.objects.get(meeting_id="1234").status, EolZoomEventInbox.FAILED)
 
     @override_settings(EOLZOOM_EVENT_AUTHORIZATION = '1234567890asdfgh')
     @patch('eolzoom.utils_youtube.create_live_in_youtube')
     @patch('eolzoom.utils_youtube.check_status_live_youtube')
-    @patch("requests.patch")
-    @patch("requests.post")
+    @patch("eolzoom.http_client.patch")
+    @patch("eolzoom.http_client.post")
     def test_event_zoom_youtube_re_start_fail_update_meeting(self, post, patch, check_yt, stream_dict):
         """
             Test event_zoom if meeting is re open and fail in update data stream in meeting
@@ -1563,10 +2517,9 @@ class TestEolZoomAPI(UrlResetMixin, ModuleStoreTestCase):
                     }
                 }
             }
-        EolZoomMappingUserMeet.objects.create(
+        user_model = EolZoomMappingUserMeet.objects.create(
             meeting_id="1234", 
             user=self.user, 
-            broadcast_ids="youtube_id", 
             title="I am a title", 
             is_enabled=True,
             restricted_access=False,
@@ -1574,6 +2527,7 @@ class TestEolZoomAPI(UrlResetMixin, ModuleStoreTestCase):
             usage_key=UsageKey.from_string(self.block_id),
             email_notification=False
             )
+        EolZoomBroadcast.objects.create(meeting=user_model, broadcast_id="youtube_id")
         request = TestRequest()
         request.method = 'POST'
         data = json.dumps(post_data).encode('utf-8')
@@ -1582,13 +2536,14 @@ class TestEolZoomAPI(UrlResetMixin, ModuleStoreTestCase):
         request.headers = headers
         request.params = post_data
         result = views.event_zoom(request)
-        self.assertEqual(result.status_code, 400)
+        self.assertEqual(result.status_code, 200)
+        self.assertEqual(EolZoomEventInbox.objects.get(meeting_id="1234").status, EolZoomEventInbox.FAILED)
 
     @override_settings(EOLZOOM_EVENT_AUTHORIZATION = '1234567890asdfgh')
     @patch('eolzoom.utils_youtube.create_live_in_youtube')
     @patch('eolzoom.utils_youtube.check_status_live_youtube')
-    @patch("requests.patch")
-    @patch("requests.post")
+    @patch("eolzoom.http_client.patch")
+    @patch("eolzoom.http_client.post")
     def test_event_zoom_youtube_re_start_fail_update_status(self, post, patch, check_yt, stream_dict):
         """
             Test event_zoom if meeting is re open and fail in update status meeting
@@ -1627,10 +2582,9 @@ class TestEolZoomAPI(UrlResetMixin, ModuleStoreTestCase):
                     }
                 }
             }
-        EolZoomMappingUserMeet.objects.create(
+        user_model = EolZoomMappingUserMeet.objects.create(
             meeting_id="1234", 
             user=self.user, 
-            broadcast_ids="youtube_id", 
             title="I am a title", 
             is_enabled=True,
             restricted_access=False,
@@ -1638,6 +2592,7 @@ class TestEolZoomAPI(UrlResetMixin, ModuleStoreTestCase):
             usage_key=UsageKey.from_string(self.block_id),
             email_notification=True
             )
+        EolZoomBroadcast.objects.create(meeting=user_model, broadcast_id="youtube_id")
         request = TestRequest()
         request.method = 'POST'
         data = json.dumps(post_data).encode('utf-8')
@@ -1646,7 +2601,8 @@ class TestEolZoomAPI(UrlResetMixin, ModuleStoreTestCase):
         request.headers = headers
         request.params = post_data
         result = views.event_zoom(request)
-        self.assertEqual(result.status_code, 400)
+        self.assertEqual(result.status_code, 200)
+        self.assertEqual(EolZoomEventInbox.objects.get(meeting_id="1234").status, EolZoomEventInbox.FAILED)
 
     @override_settings(EOLZOOM_EVENT_AUTHORIZATION = '1234567890asdfgh')
     def test_event_zoom_youtube_user_not_enabled(self):
@@ -1664,10 +2620,9 @@ class TestEolZoomAPI(UrlResetMixin, ModuleStoreTestCase):
                     }
                 }
             }
-        EolZoomMappingUserMeet.objects.create(
+        user_model = EolZoomMappingUserMeet.objects.create(
             meeting_id="1234", 
             user=self.user, 
-            broadcast_ids="youtube_id", 
             title="I am a title", 
             is_enabled=False,
             restricted_access=False,
@@ -1675,6 +2630,7 @@ class TestEolZoomAPI(UrlResetMixin, ModuleStoreTestCase):
             usage_key=UsageKey.from_string(self.block_id),
             email_notification=False
             )
+        EolZoomBroadcast.objects.create(meeting=user_model, broadcast_id="youtube_id")
         request = TestRequest()
         request.method = 'POST'
         data = json.dumps(post_data).encode('utf-8')
@@ -1684,6 +2640,7 @@ class TestEolZoomAPI(UrlResetMixin, ModuleStoreTestCase):
         request.params = post_data
         result = views.event_zoom(request)
         self.assertEqual(result.status_code, 200)
+        self.assertEqual(EolZoomEventInbox.objects.get(meeting_id="1234").status, EolZoomEventInbox.PROCESSED)
 
 class TestEolZoomXBlock(UrlResetMixin, ModuleStoreTestCase):
 
@@ -1789,6 +2746,91 @@ class TestEolZoomXBlock(UrlResetMixin, ModuleStoreTestCase):
         self.assertEqual(self.xblock.restricted_access, False)
         self.assertEqual(self.xblock.email_notification, False)
 
+    def test_render_resources_cache(self):
+        """
+            Check resources and templates are loaded once per process
+        """
+        from . import eolzoom
+        eolzoom._resources_cache.clear()
+        eolzoom._templates_cache.clear()
+        eolzoom._hashes_cache.clear()
+        with patch('eolzoom.eolzoom.pkg_resources.resource_string', return_value=b'{{ status }}') as resource_string:
+            first_view = self.xblock.student_view()
+            calls = resource_string.call_count
+            second_view = self.xblock.student_view()
+        self.assertEqual(resource_string.call_count, calls)
+        self.assertEqual(first_view.content, second_view.content)
+        eolzoom._resources_cache.clear()
+        eolzoom._templates_cache.clear()
+        eolzoom._hashes_cache.clear()
+
+    def test_get_students_count_cached(self):
+        """
+            Check enrolled students count is cached and updated by enrollment changes
+        """
+        from common.djangoapps.student.models import CourseEnrollment
+        test_cache = LocMemCache('eolzoom_count_tests', {})
+        course_id = text_type(self.course.id)
+        with patch('eolzoom.eolzoom.cache', test_cache), patch('eolzoom.signals.cache', test_cache):
+            self.assertEqual(self.xblock.get_students_count(course_id), 2)
+            with self.assertNumQueries(0):
+                self.assertEqual(self.xblock.get_students_count(course_id), 2)
+            CourseEnrollment.enroll(UserFactory(), self.course.id)
+            self.assertEqual(self.xblock.get_students_count(course_id), 3)
+
+    def test_get_urls_memoized(self):
+        """
+            Check block urls are computed once and refreshed when the block configuration changes
+        """
+        from . import eolzoom
+        eolzoom._get_url_bundle.cache_clear()
+        eolzoom._get_start_public_meeting_url.cache_clear()
+        self.xblock.meeting_id = '1234'
+        with patch('eolzoom.eolzoom.reverse', wraps=reverse) as mock_reverse:
+            urls = self.xblock.get_urls()
+            calls = mock_reverse.call_count
+            self.assertEqual(self.xblock.get_urls(), urls)
+            self.assertEqual(mock_reverse.call_count, calls)
+            self.xblock.restricted_access = True
+            restricted_urls = self.xblock.get_urls()
+            self.assertEqual(mock_reverse.call_count, calls + 1)
+        self.assertEqual(urls['url_start_meeting'], reverse('start_meeting'))
+        self.assertNotEqual(urls['url_start_public_meeting'], restricted_urls['url_start_public_meeting'])
+        self.assertIn('/True', restricted_urls['url_start_public_meeting'])
+
+    def test_student_view_static_urls(self):
+        """
+            Check student view references css and js by url (not inline)
+        """
+        self.xblock.runtime.local_resource_url = Mock(side_effect=lambda block, path: '/resource/{}'.format(path))
+        student_view = self.xblock.student_view()
+        urls = [resource.data for resource in student_view.resources if resource.kind == 'url']
+        self.assertEqual(len(urls), 2)
+        self.assertTrue(urls[0].startswith('/resource/public/css/eolzoom.css?v='))
+        self.assertTrue(urls[1].startswith('/resource/public/js/src/eolzoom.js?v='))
+        self.assertFalse([resource for resource in student_view.resources if resource.kind == 'text'])
+
+    def test_static_url_content_hash(self):
+        """
+            Check static urls are versioned with the content of the file (changes invalidate browser caches)
+        """
+        from . import eolzoom
+        self.xblock.runtime.local_resource_url = Mock(side_effect=lambda block, path: '/resource/{}'.format(path))
+        eolzoom._resources_cache.clear()
+        eolzoom._hashes_cache.clear()
+        content = self.xblock.resource_string('public/js/src/eolzoom.js')
+        self.assertEqual(
+            self.xblock.static_url('public/js/src/eolzoom.js'),
+            '/resource/public/js/src/eolzoom.js?v={}'.format(hashlib.md5(content.encode('utf8')).hexdigest()[:12]))
+        eolzoom._resources_cache.clear()
+        eolzoom._hashes_cache.clear()
+        with patch('eolzoom.eolzoom.pkg_resources.resource_string', return_value=b'new content'):
+            self.assertNotIn(
+                hashlib.md5(content.encode('utf8')).hexdigest()[:12],
+                self.xblock.static_url('public/js/src/eolzoom.js'))
+        eolzoom._resources_cache.clear()
+        eolzoom._hashes_cache.clear()
+
     def test_student_view_without_configuration(self):
         """
             Check if error message is triggered when a meeting is not configured
@@ -1984,6 +3026,32 @@ class TestEmailTask(UrlResetMixin, ModuleStoreTestCase):
         email = email_tasks.meeting_start_email(self.block_id, "test@test.test")
         self.assertEqual(email, 1)
 
+    @patch('eolzoom.email_tasks.get_course_by_id')
+    def test_meeting_start_emails(self, get_course_by_id):
+        """
+            Test send a chunk of emails with one connection
+        """
+        get_course_by_id.return_value = Mock(display_name_with_default='display_name_with_default')
+        emails = email_tasks.meeting_start_emails(
+            self.block_id, ["test1@test.test", "test2@test.test"])
+        self.assertEqual(emails, 2)
+        self.assertEqual(get_course_by_id.call_count, 1)
+        self.assertEqual(len(mail.outbox), 2)
+        self.assertEqual(mail.outbox[1].to, ["test2@test.test"])
+
+    @patch('eolzoom.email_tasks.cache', LocMemCache('eolzoom_email_tests', {}))
+    @patch('eolzoom.email_tasks.get_course_by_id')
+    def test_meeting_start_message_cached(self, get_course_by_id):
+        """
+            Test the meeting start message is rendered once per block
+        """
+        get_course_by_id.return_value = Mock(display_name_with_default='display_name_with_default')
+        email_tasks.meeting_start_emails(self.block_id, ["test1@test.test"])
+        email_tasks.meeting_start_email(self.block_id, "test2@test.test")
+        self.assertEqual(get_course_by_id.call_count, 1)
+        self.assertEqual(len(mail.outbox), 2)
+        self.assertEqual(mail.outbox[0].subject, mail.outbox[1].subject)
+
 
 class TestEolYouTubeAPI(UrlResetMixin, ModuleStoreTestCase):
     def setUp(self):
@@ -2211,7 +3279,7 @@ class TestEolYouTubeAPI(UrlResetMixin, ModuleStoreTestCase):
             'code': 'asdf'})
         self.assertEqual(result.status_code, 400)
 
-    @patch("requests.post")
+    @patch("eolzoom.http_client.post")
     def test_google_is_logged(self, post):
         """
             Test google_is_logged normal process
@@ -2258,7 +3326,7 @@ class TestEolYouTubeAPI(UrlResetMixin, ModuleStoreTestCase):
         self.assertEqual(data['channel'], False)
         self.assertEqual(data['livestream_zoom'], False)
 
-    @patch("requests.post")
+    @patch("eolzoom.http_client.post")
     def test_google_is_logged_error_refresh_token(self, post):
         """
             Test google_is_logged if occur error in get refresh token
@@ -2316,7 +3384,7 @@ class TestEolYouTubeAPI(UrlResetMixin, ModuleStoreTestCase):
         self.assertEqual(data['livestream_zoom'], False)
         self.assertEqual(new_credentials, credentials)
 
-    @patch("requests.post")
+    @patch("eolzoom.http_client.post")
     def test_google_is_logged_post(self, post):
         """
             Test google_is_logged if request if post
@@ -2329,9 +3397,9 @@ class TestEolYouTubeAPI(UrlResetMixin, ModuleStoreTestCase):
     @override_settings(GOOGLE_CLIENT_SECRET='1234567890asdfgh')
     @patch('eolzoom.utils_youtube.check_permission_live')
     @patch('eolzoom.utils_youtube.check_permission_channels')
-    @patch("requests.get")
-    @patch("requests.patch")
-    @patch("requests.post")
+    @patch("eolzoom.http_client.get")
+    @patch("eolzoom.http_client.patch")
+    @patch("eolzoom.http_client.post")
     def test_youtube_validate(self, post, patch, get, channel, live):
         """
             Test youtube_validate normal process
@@ -2381,9 +3449,9 @@ class TestEolYouTubeAPI(UrlResetMixin, ModuleStoreTestCase):
     @override_settings(GOOGLE_CLIENT_SECRET='1234567890asdfgh')
     @patch('eolzoom.utils_youtube.check_permission_live')
     @patch('eolzoom.utils_youtube.check_permission_channels')
-    @patch("requests.get")
-    @patch("requests.patch")
-    @patch("requests.post")
+    @patch("eolzoom.http_client.get")
+    @patch("eolzoom.http_client.patch")
+    @patch("eolzoom.http_client.post")
     def test_youtube_validate_not_channel_live(self, post, patch, get, channel, live):
         """
             Test youtube_validate if user dont have channel or live permission
@@ -2584,8 +3652,8 @@ class TestEolYouTubeAPI(UrlResetMixin, ModuleStoreTestCase):
     GOOGLE_CLIENT_ID='test-client-id.apps.googleusercontent.com')
     @override_settings(GOOGLE_CLIENT_SECRET='1234567890asdfgh')
     @patch('eolzoom.utils_youtube.create_live_in_youtube')
-    @patch("requests.patch")
-    @patch("requests.post")
+    @patch("eolzoom.http_client.patch")
+    @patch("eolzoom.http_client.post")
     def test_create_livebroadcast(self, post, patch, stream_dict):
         """
             Test create_livebroadcast normal process
@@ -2719,8 +3787,8 @@ class TestEolYouTubeAPI(UrlResetMixin, ModuleStoreTestCase):
     @override_settings(GOOGLE_CLIENT_ID = 'test-client-id.apps.googleusercontent.com')
     @override_settings(GOOGLE_CLIENT_SECRET = '1234567890asdfgh')
     @patch('eolzoom.utils_youtube.create_live_in_youtube')
-    @patch("requests.patch")
-    @patch("requests.post")
+    @patch("eolzoom.http_client.patch")
+    @patch("eolzoom.http_client.post")
     def test_create_livebroadcast_fail_update_meeting_zoom(self, post, patch, stream_dict):
         """
             Test create_livebroadcast if fail update status livestream in zoom meeting 
@@ -2776,11 +3844,12 @@ class TestEolYouTubeAPI(UrlResetMixin, ModuleStoreTestCase):
     GOOGLE_CLIENT_ID='test-client-id.apps.googleusercontent.com')
     @override_settings(GOOGLE_CLIENT_SECRET='1234567890asdfgh')
     @patch('eolzoom.utils_youtube.create_live_in_youtube')
-    @patch("requests.patch")
-    @patch("requests.post")
-    def test_create_livebroadcast_long_broadcast_id(self, post, patch, stream_dict):
+    @patch("eolzoom.http_client.patch")
+    @patch("eolzoom.http_client.post")
+    def test_create_livebroadcast_broadcast_history(self, post, patch, stream_dict):
         """
-            Test create_livebroadcast when user have over 21 livebroadcast for one meeting
+            Test create_livebroadcast when user have over 21 livebroadcast for one meeting,
+            the broadcast history is not limited
         """
         new_expiry = dt.now() + datetime.timedelta(seconds=3600)
         credentials = {
@@ -2789,8 +3858,10 @@ class TestEolYouTubeAPI(UrlResetMixin, ModuleStoreTestCase):
             'token_uri': "https://www.googleapis.com/oauth2/v3/token",
             'scopes': ["https://www.googleapis.com/auth/youtube.force-ssl"],
             'expiry': str(new_expiry)}
-        broadcast_ids = "1234567890123456789012345678901234567890123456789012345678901234567890123456789012345678901234567890123456789012345678901234567890123456789012345678901234567890123456789012345678901234567890123456789012345678901234567890123456789012345678901234567890"
-        EolZoomMappingUserMeet.objects.create(meeting_id="676767", user=self.user, title="I am a title", broadcast_ids=broadcast_ids, is_enabled=True)
+        user_model = EolZoomMappingUserMeet.objects.create(meeting_id="676767", user=self.user, title="I am a title", is_enabled=True)
+        EolZoomBroadcast.objects.bulk_create([
+            EolZoomBroadcast(meeting=user_model, broadcast_id="12345678901{}".format(i))
+            for i in range(30)])
         EolGoogleAuth.objects.create(
             user=self.user,
             credentials=json.dumps(credentials),
@@ -2829,11 +3900,14 @@ class TestEolYouTubeAPI(UrlResetMixin, ModuleStoreTestCase):
         }
         result = self.client.post(reverse('url_new_livebroadcast'), post_data)
         data = json.loads(result.content.decode())
-        self.assertEqual(data['status'], 'error')
+        self.assertEqual(data['status'], 'ok')
+        self.assertEqual(data['id_broadcast'], '12345')
+        self.assertEqual(user_model.broadcasts.count(), 31)
+        self.assertEqual(utils_youtube.get_last_broadcast(user_model).broadcast_id, '12345')
 
-    @patch("requests.get")
-    @patch("requests.patch")
-    @patch("requests.post")
+    @patch("eolzoom.http_client.get")
+    @patch("eolzoom.http_client.patch")
+    @patch("eolzoom.http_client.post")
     def test_check_permission_live_user_setting(self, post, patch, get):
         """
             Test check_permission_live_user_setting function normal process
@@ -2860,9 +3934,9 @@ class TestEolYouTubeAPI(UrlResetMixin, ModuleStoreTestCase):
         resp = utils_youtube.check_permission_live_user_setting(self.user, data)
         self.assertTrue(resp['livestream_zoom'])
 
-    @patch("requests.get")
-    @patch("requests.patch")
-    @patch("requests.post")
+    @patch("eolzoom.http_client.get")
+    @patch("eolzoom.http_client.patch")
+    @patch("eolzoom.http_client.post")
     def test_check_permission_live_user_setting_return_false(self, post, patch, get):
         """
             Test check_permission_live_user_setting function if user dont have enabled custom_live_streaming_service
@@ -2889,9 +3963,9 @@ class TestEolYouTubeAPI(UrlResetMixin, ModuleStoreTestCase):
         resp = utils_youtube.check_permission_live_user_setting(self.user, data)
         self.assertFalse(resp['livestream_zoom'])
 
-    @patch("requests.get")
-    @patch("requests.patch")
-    @patch("requests.post")
+    @patch("eolzoom.http_client.get")
+    @patch("eolzoom.http_client.patch")
+    @patch("eolzoom.http_client.post")
     def test_check_permission_live_user_setting_fail_get(self, post, patch, get):
         """
             Test check_permission_live_user_setting function fail requests.get
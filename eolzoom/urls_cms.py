@@ -3,7 +3,7 @@
 from django.conf.urls import url
 from django.conf import settings
 
-from .views import zoom_api, new_scheduled_meeting, is_logged_zoom, update_scheduled_meeting, start_meeting, start_public_meeting, get_student_join_url, event_zoom
+from .views import zoom_api, new_scheduled_meeting, is_logged_zoom, update_scheduled_meeting, start_meeting, start_public_meeting, get_student_join_url, wait_student_join_url, event_zoom
 from .youtube_views import google_is_logged, auth_google, callback_google_auth, create_livebroadcast, youtube_validate, update_livebroadcast
 
 from django.contrib.auth.decorators import login_required
@@ -60,6 +60,11 @@ urlpatterns = (
         login_required(get_student_join_url),
         name='get_student_join_url',
     ),
+    url(
+        r'^zoom/wait_student_join_url',
+        login_required(wait_student_join_url),
+        name='wait_student_join_url',
+    ),
     url(
         r'^zoom/create_livebroadcast',
         login_required(create_livebroadcast),
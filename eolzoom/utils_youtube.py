@@ -6,7 +6,6 @@ from django.urls import reverse
 from django.http import HttpResponse, HttpResponseRedirect, JsonResponse
 from django.conf import settings
 
-import requests
 import json
 import urllib.request
 import urllib.parse
@@ -20,9 +19,11 @@ import threading
 from django.contrib.auth.models import User
 from django.db import IntegrityError, transaction
 from django.shortcuts import render
-from .models import EolZoomAuth, EolZoomRegistrant, EolGoogleAuth, EolZoomMappingUserMeet
+from . import http_client
+from .rate_limit import zoom_request
+from .models import EolZoomAuth, EolZoomRegistrant, EolGoogleAuth, EolZoomMappingUserMeet, EolZoomBroadcast
 from six import text_type
-from .views import _get_refresh_token, get_access_token
+from .views import get_user_access_token
 from openedx.core.djangoapps.site_configuration import helpers as configuration_helpers
 
 import httplib2
@@ -109,7 +110,7 @@ def refresh_access_token_oauth2(refresh_token, token_uri):
         'refresh_token': refresh_token,
         'grant_type': 'refresh_token',
     }
-    response = requests.post(token_uri, params=urlencode(query))
+    response = http_client.post(token_uri, params=urlencode(query))
     if response.status_code != 200:
         logger.error('Error in refresh token, response: {}'.format(response.text))
         return None
@@ -238,13 +239,13 @@ def bind_broadcast(youtube, broadcast_id, stream_id):
         bind_broadcast_response["contentDetails"]["boundStreamId"]))
 
 
-def update_meeting_youtube(user, stream_dict, meet_id, access_token=None):
+def update_meeting_youtube(user, stream_dict, meet_id, access_token=None, blocking=True):
     """
         Set livestreams youtube in zoom meeting
+        blocking=False in web requests (rate governor fails fast)
     """
     if access_token is None:
-        refresh_token = _get_refresh_token(user)
-        token = get_access_token(user, refresh_token)
+        token = get_user_access_token(user)
         if 'error' in token:
             logger.error("Error get_access_token {}, meet_id: {}, user: {}".format(token['error'], meet_id, user))
             return None
@@ -259,8 +260,12 @@ def update_meeting_youtube(user, stream_dict, meet_id, access_token=None):
         "stream_key": stream_dict["stream_key"],
         "page_url": "https://youtu.be/{}".format(stream_dict['broadcast_id'])
     }
-    r = requests.patch(
+    r = zoom_request(
+        'PATCH',
         url,
+        category='light',
+        account=user.id,
+        blocking=blocking,
         data=json.dumps(body),
         headers=headers)
     if r.status_code == 204:
@@ -271,7 +276,7 @@ def update_meeting_youtube(user, stream_dict, meet_id, access_token=None):
 
 def check_event_zoom_params(request):
     """
-        Verify if params of zoom event is correct
+        Verify method and authorization of zoom event (body is validated by parse_zoom_event)
     """
     if request.method != "POST":
         logger.error("Request method is not POST")
@@ -280,12 +285,9 @@ def check_event_zoom_params(request):
         logger.error("Setting EOLZOOM_EVENT_AUTHORIZATION is empty")
         return False
     auth = settings.EOLZOOM_EVENT_AUTHORIZATION
-    if request.headers['Authorization'] != auth:
-        logger.error("Authorization is incorrect, auth_original: {}, auth_request: {}".format(auth, request.headers['Authorization']))
-        return False
-    data = json.loads(request.body.decode())
-    if 'event' not in data or 'payload' not in data:
-        logger.error("Params error, request.body: {}".format(request.body))
+    if request.headers.get('Authorization') != auth:
+        # The authorization values are secrets, they are not logged
+        logger.error("Authorization is incorrect, remote_addr: {}".format(request.META.get('REMOTE_ADDR', '')))
         return False
     return True
 
@@ -323,8 +325,11 @@ def patch_meeting_zoom_start(user, meet_id, access_token):
     response = {}
     url = "https://api.zoom.us/v2/meetings/{}/livestream/status".format(
         meet_id)
-    r = requests.patch(
+    r = zoom_request(
+        'PATCH',
         url,
+        category='light',
+        account=user.id,
         data=json.dumps(body),
         headers=headers)
     if r.status_code == 204:
@@ -334,6 +339,35 @@ def patch_meeting_zoom_start(user, meet_id, access_token):
         response["live"] = "error to start live with zoom meeting"
     return response
 
+def stop_live_youtube(user_model):
+    """
+        Complete the last livebroadcast of the meeting (meeting ended)
+    """
+    broadcast = get_last_broadcast(user_model)
+    if broadcast is None:
+        return False
+    id_live = broadcast.broadcast_id
+    youtube = create_youtube_object(user_model.user)
+    if youtube is None:
+        return False
+    try:
+        youtube.liveBroadcasts().transition(
+            broadcastStatus="complete",
+            id=id_live,
+            part="id,status"
+        ).execute()
+        set_broadcast_status(broadcast, "complete")
+        return True
+    except HttpError as e:
+        # https://developers.google.com/youtube/v3/live/docs/liveBroadcasts/transition#errors
+        logger.error(
+            "An HTTP error {} occurred:\n{}".format(
+                e.resp.status, e.content))
+        return False
+    except RefreshError:
+        logger.error("An error occurred with token user in stop_live_youtube(), id_broadcast: {}, user: {}".format(id_live, user_model.user))
+        return False
+
 def create_new_live(user_model, access_token=None):
     """
         Create new livestream in youtube and update stream data in zoom meeting
@@ -365,15 +399,19 @@ def check_status_live_youtube(user_model):
         created: livebroadcast is created, strem not setted
         live: started livebroadcast
     """
-    list_broadcast_id = user_model.broadcast_ids.split(" ")
+    broadcast = get_last_broadcast(user_model)
+    if broadcast is None:
+        return False
+    id_live = broadcast.broadcast_id
     youtube = create_youtube_object(user_model.user)
     try:
         response = youtube.liveBroadcasts().list(
             part="id, status",
-            id=list_broadcast_id[-1]
+            id=id_live
         ).execute()
         item = response['items']
         if len(item) > 0:
+            set_broadcast_status(broadcast, item[0]["status"]['lifeCycleStatus'])
             if item[0]["status"]['lifeCycleStatus'] == "ready":
                 return True
         return False
@@ -384,7 +422,7 @@ def check_status_live_youtube(user_model):
                 e.resp.status, e.content))
         return None
     except RefreshError:
-        logger.error("An error occurred with token user in check_status_live_youtube(), id_broadcast: {}, user:".format(list_broadcast_id[-1], user_model.user))
+        logger.error("An error occurred with token user in check_status_live_youtube(), id_broadcast: {}, user: {}".format(id_live, user_model.user))
         return None
 
 def create_youtube_object(user):
@@ -434,8 +472,7 @@ def check_permission_live_user_setting(user, data):
     """
         Verify if user have enabled custom livestream service in zoom setting
     """
-    refresh_token = _get_refresh_token(user)
-    token = get_access_token(user, refresh_token)
+    token = get_user_access_token(user)
     if 'error' in token:
         logger.error("Error get_access_token {}, user: {}".format(token['error'],user))
         return data
@@ -450,8 +487,12 @@ def check_permission_live_user_setting(user, data):
     user_id = 'me'
     url = "https://api.zoom.us/v2/users/{}/settings".format(
         user_id)
-    r = requests.get(
+    r = zoom_request(
+        'GET',
         url,
+        category='light',
+        account=user.id,
+        blocking=False,
         headers=headers)
     if r.status_code == 200:
         response = json.loads(r.content.decode("utf-8"))
@@ -538,19 +579,28 @@ def update_live_in_youtube(youtube, start_time, title, id_live):
 
 def save_broadcast_id(meet_id, broadcast_id):
     """
-        Add new broadcast_id to EolZoomMappingUserMeet
+        Add new broadcast to the history of EolZoomMappingUserMeet
     """
     try:
         user_model = EolZoomMappingUserMeet.objects.get(meeting_id=meet_id)
-        if len(user_model.broadcast_ids) > 241:
-            logger.error("User have a lot of broadcast id in one meeting, Meeting {}, user: {}, broadcast_ids: {}, miss broadcast id: {}".format(meet_id, user_model.user, user_model.broadcast_ids, broadcast_id))
-            return False
-        if user_model.broadcast_ids == "":
-            user_model.broadcast_ids = broadcast_id
-        else:
-            user_model.broadcast_ids = "{} {}".format(user_model.broadcast_ids, broadcast_id)
-        user_model.save()
+        EolZoomBroadcast.objects.get_or_create(
+            meeting=user_model,
+            broadcast_id=broadcast_id)
         return True
     except EolZoomMappingUserMeet.DoesNotExist:
         logger.error("Dont exists mapping user-meeting, Meeting {}".format(meet_id))
-        return False
\ No newline at end of file
+        return False
+
+def get_last_broadcast(user_model):
+    """
+        Get the last livebroadcast of the meeting, None if the meeting doesn't have broadcasts
+    """
+    return user_model.broadcasts.order_by('-created', '-id').first()
+
+def set_broadcast_status(broadcast, status):
+    """
+        Save the last known Youtube lifeCycleStatus of the livebroadcast
+    """
+    if broadcast.status != status:
+        broadcast.status = status
+        broadcast.save(update_fields=['status'])
\ No newline at end of file
@@ -4,10 +4,10 @@
 from django.contrib.auth.models import User
 
 from django.urls import reverse
-from django.http import HttpResponse, HttpResponseRedirect, JsonResponse
+from django.http import HttpRequest, HttpResponse, HttpResponseRedirect, JsonResponse
 from django.conf import settings
+from django.core.cache import cache
 
-import requests
 import json
 import urllib.request
 import urllib.parse
@@ -16,19 +16,25 @@ import base64
 from django.views.generic.base import View
 from celery import task
 import time
-import threading
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, as_completed, wait
+from itertools import islice
 
 from lms.djangoapps.instructor_task.tasks_base import BaseInstructorTask
 from lms.djangoapps.instructor_task.api_helper import submit_task
 from lms.djangoapps.instructor_task.api_helper import AlreadyRunningError
-from lms.djangoapps.instructor_task.tasks_helper.runner import run_main_task
+from lms.djangoapps.instructor_task.tasks_helper.runner import run_main_task, TaskProgress
 from functools import partial
 from django.contrib.auth.models import User
 from django.db import IntegrityError, transaction
+from django.db.models import Q
+from django.utils import timezone
 from django.utils.translation import ugettext_noop
 from django.shortcuts import render
-from .email_tasks import meeting_start_email
-from .models import EolZoomAuth, EolZoomRegistrant, EolGoogleAuth, EolZoomMappingUserMeet
+from .email_tasks import meeting_start_emails
+from . import http_client
+from .rate_limit import zoom_request
+from .webhooks import InvalidZoomEvent, get_event_handler, parse_zoom_event, register_event_handler
+from .models import EolZoomAuth, EolZoomRegistrant, EolGoogleAuth, EolZoomMappingUserMeet, EolZoomEventInbox, EolZoomParticipant
 from opaque_keys.edx.keys import CourseKey, UsageKey
 from opaque_keys import InvalidKeyError
 from six import text_type
@@ -41,6 +47,7 @@ import sys
 from datetime import datetime as dt
 import datetime
 import random
+import pytz
 import string
 
 import logging
@@ -48,6 +55,16 @@ logger = logging.getLogger(__name__)
 
 
 MAX_REGISTRANT_STATUS = 30  # Max possible (API)
+EVENT_DEFAULT_RETRY_DELAY = 60
+EVENT_MAX_RETRIES = 3
+EVENT_QUEUE = 'edx.lms.core.high'
+# Many events by meeting, processed in EOLZOOM_EVENT_LOW_PRIORITY_QUEUE
+LOW_PRIORITY_EVENTS = ('meeting.participant_joined', 'meeting.participant_left')
+ACCESS_TOKEN_CACHE_KEY = 'eolzoom:access_token:{}'
+JOIN_URL_CACHE_KEY = 'eolzoom:join_url:{}:{}'
+MEETING_LIVE_CACHE_KEY = 'eolzoom:meeting_live:{}'
+JOIN_URL_PENDING_CACHE_KEY = 'eolzoom:join_url_pending:{}'
+REGISTRANT_STATUS = {'approve': 'approved', 'cancel': 'cancelled'}
 
 
 def zoom_api(request):
@@ -76,6 +93,7 @@ def zoom_api(request):
         return HttpResponse(status=400)
 
     _update_auth(user, token['refresh_token'])
+    _set_cached_access_token(user, token)
 
     return HttpResponseRedirect(redirect)
 
@@ -132,8 +150,7 @@ def set_scheduled_meeting(request, url, api_method):
         Set all attributes and create/update meeting
     """
     user = request.user
-    refresh_token = _get_refresh_token(user)
-    token = get_access_token(user, refresh_token)
+    token = get_user_access_token(user)
     try:
         course_id = CourseKey.from_string(request.POST['course_id'])
         block_id = UsageKey.from_string(request.POST['block_id'])
@@ -177,8 +194,12 @@ def set_scheduled_meeting(request, url, api_method):
     if api_method == 'POST':
         if request.POST['restricted_access'] != 'true':
             body['password'] = _generate_password()
-        r = requests.post(
+        r = zoom_request(
+            'POST',
             url,
+            category='medium',
+            account=user.id,
+            blocking=False,
             data=json.dumps(body),
             headers=headers)  # CREATE
         if r.status_code == 201:
@@ -202,13 +223,18 @@ def set_scheduled_meeting(request, url, api_method):
                 course_key=course_id,
                 restricted_access=request.POST['restricted_access'] == 'true',
                 email_notification=request.POST['email_notification'] == 'true',
-                usage_key=block_id
+                usage_key=block_id,
+                scheduled_end=get_scheduled_end(start_time, duration, timezone)
                 )
         else:
             return HttpResponse(status=r.status_code)
     elif api_method == 'PATCH':
-        r = requests.patch(
+        r = zoom_request(
+            'PATCH',
             url,
+            category='medium',
+            account=user.id,
+            blocking=False,
             data=json.dumps(body),
             headers=headers)  # UPDATE
         if r.status_code == 204:
@@ -225,13 +251,55 @@ def set_scheduled_meeting(request, url, api_method):
                     'course_key': course_id,
                     'restricted_access': request.POST['restricted_access'] == 'true',
                     'email_notification': request.POST['email_notification'] == 'true',
-                    'usage_key': block_id
+                    'usage_key': block_id,
+                    'scheduled_end': get_scheduled_end(start_time, duration, timezone)
                     })
         else:
             return HttpResponse(status=r.status_code)
+    if request.POST['restricted_access'] == 'true' and settings.EOLZOOM_PREREGISTER_STUDENTS:
+        _preregister_students(
+            request,
+            user,
+            response['meeting_id'],
+            course_id,
+            block_id)
     return JsonResponse(response)
 
 
+def get_scheduled_end(start_time, duration, time_zone):
+    """
+        Scheduled end of the meeting (start_time: yyyy-mm-ddTHH:mm:ss in time_zone, duration in minutes)
+        None if the values are not valid
+    """
+    try:
+        start = pytz.timezone(time_zone).localize(dt.strptime(start_time, '%Y-%m-%dT%H:%M:%S'))
+        return start + datetime.timedelta(minutes=int(duration))
+    except (ValueError, TypeError, pytz.UnknownTimeZoneError):
+        logger.error("EolZoom - Error with scheduled meeting start_time: {}, duration: {}".format(start_time, duration))
+        return None
+
+
+def _preregister_students(request, user, meeting_id, course_id, block_id):
+    """
+        Register enrolled students in background when a restricted meeting is scheduled
+        (meeting.started event will only register the missing students)
+    """
+    try:
+        task_register_meeting_users(
+            request,
+            user,
+            text_type(meeting_id),
+            text_type(course_id),
+            text_type(block_id),
+            False,
+            preregister=True)
+    except AlreadyRunningError:
+        pass
+    except Exception as e:
+        # Best-effort, the meeting.started event registers the missing students
+        logger.error("EolZoom - Error preregister students, meeting_id: {}, exception: {}".format(meeting_id, str(e)))
+
+
 def get_access_token(user, refresh_token):
     """
         Get Access Token from Zoom Api
@@ -246,7 +314,7 @@ def get_access_token(user, refresh_token):
     headers = {
         'Authorization': 'Basic {}'.format(settings.EOLZOOM_AUTHORIZATION)
     }
-    r = requests.post(url, headers=headers)
+    r = http_client.post(url, headers=headers)
     try:
         token = r.json()
         if 'error' not in token:
@@ -256,6 +324,61 @@ def get_access_token(user, refresh_token):
         return {'error': 'json response error'}
 
 
+def get_user_access_token(user, min_ttl=0):
+    """
+        Get user Access Token from cache.
+        If it is not cached (or it is about to expire) get a new one from Zoom Api.
+        min_ttl: seconds the token must still be valid (long running tasks)
+    """
+    cache_key = ACCESS_TOKEN_CACHE_KEY.format(user.id)
+    token = _get_cached_access_token(cache_key, min_ttl)
+    if token is not None:
+        return token
+    # Zoom invalidates the refresh token on every use, so concurrent refreshes
+    # are serialized with a row lock. Waiters check the cache again once they
+    # get the lock and reuse the token refreshed by the request in flight.
+    with transaction.atomic():
+        zoom_auth = EolZoomAuth.objects.select_for_update().filter(user=user).first()
+        token = _get_cached_access_token(cache_key, min_ttl)
+        if token is not None:
+            return token
+        refresh_token = zoom_auth.zoom_refresh_token if zoom_auth else None
+        token = get_access_token(user, refresh_token)
+        if 'error' not in token:
+            _set_cached_access_token(user, token)
+    return token
+
+
+def _get_cached_access_token(cache_key, min_ttl):
+    """
+        Get the cached access token if it is still valid for min_ttl seconds
+    """
+    token = cache.get(cache_key)
+    if token is None:
+        return None
+    if min_ttl and token.get('expires_at', 0) - time.time() < min_ttl:
+        return None
+    return token
+
+
+def _set_cached_access_token(user, token):
+    """
+        Save access token in cache until shortly before it expires
+        (refresh token is not cached, it is saved in models)
+    """
+    timeout = token.get('expires_in', 0) - settings.EOLZOOM_ACCESS_TOKEN_EXPIRY_MARGIN
+    if 'access_token' not in token or timeout <= 0:
+        return
+    cache.set(
+        ACCESS_TOKEN_CACHE_KEY.format(user.id),
+        {
+            'access_token': token['access_token'],
+            'expires_in': token['expires_in'],
+            'expires_at': time.time() + token['expires_in']
+        },
+        timeout)
+
+
 def _get_refresh_token(user):
     """
         Get refresh token from models
@@ -283,7 +406,7 @@ def get_refresh_token(authorization_code, redirect_uri):
     headers = {
         'Authorization': 'Basic {}'.format(settings.EOLZOOM_AUTHORIZATION)
     }
-    r = requests.post(url, headers=headers)
+    r = http_client.post(url, headers=headers)
     try:
         return r.json()
     except BaseException:
@@ -315,13 +438,13 @@ def _get_user_profile(user):
     refresh_token = _get_refresh_token(user)
     # check if refresh token exists
     if refresh_token:
-        token = get_access_token(user, refresh_token)
+        token = get_user_access_token(user)
         if 'error' in token:
             logger.error("Error get_access_token {}".format(token['error']))
             return None
         access_token = token['access_token']
 
-        user_profile = get_user_profile(access_token)
+        user_profile = get_user_profile(access_token, account=user.id)
         if 'code' in user_profile:
             logger.error(
                 "Error get_user_profile {}".format(
@@ -334,15 +457,16 @@ def _get_user_profile(user):
         return None
 
 
-def get_user_profile(access_token):
+def get_user_profile(access_token, account=None):
     """
         Using an Access Token to get User profile
+        account: user id of the token (rate limit of the host)
     """
     headers = {
         'Authorization': 'Bearer  {}'.format(access_token)
     }
     url = 'https://api.zoom.us/v2/users/me'
-    r = requests.get(url, headers=headers)
+    r = zoom_request('GET', url, category='light', account=account, blocking=False, headers=headers)
     data = r.json()
     return data
 
@@ -406,63 +530,301 @@ def start_meeting(request):
         logger.error("Error get_refresh_token {}".format(token['error']))
         return HttpResponse(status=400)
     _update_auth(user, token['refresh_token'])
+    _set_cached_access_token(user, token)
 
     return HttpResponseRedirect(create_start_url(args['meeting_id']))
 
 @transaction.non_atomic_requests
 def event_zoom(request):
+    """
+        Validate and save the zoom event (EolZoomEventInbox), then answer to Zoom.
+        The event is processed by process_event_inbox task with its registered handler
+    """
+    from .utils_youtube import check_event_zoom_params
+    if not check_event_zoom_params(request):
+        return HttpResponse(status=400)
+    try:
+        event = parse_zoom_event(request.body)
+    except InvalidZoomEvent as e:
+        logger.error("EolZoom - Invalid event: {}, request.body: {}".format(str(e), request.body))
+        return HttpResponse(status=400)
+    if get_event_handler(event) is None:
+        logger.info("EolZoom - Event without handler, event: {}, id_meeting: {}".format(event.event, event.meeting_id))
+        return HttpResponse(status=200)
+    try:
+        # Repeated deliveries (Zoom retries and repeated starts) have the same
+        # event and ZoomEvent.get_dedup_key() (unique in EolZoomEventInbox)
+        with transaction.atomic():
+            inbox = EolZoomEventInbox.objects.create(
+                event=event.event,
+                meeting_id=event.meeting_id,
+                dedup_key=event.get_dedup_key(),
+                payload=json.dumps(event.data),
+                remote_addr=request.META.get('REMOTE_ADDR', ''),
+                server_name=request.META.get('SERVER_NAME', ''))
+    except IntegrityError:
+        logger.info("EolZoom - Duplicated event, event: {}, id_meeting: {}".format(event.event, event.meeting_id))
+        return HttpResponse(status=200)
+    try:
+        queue_event_inbox(inbox.id, inbox.event)
+    except Exception as e:
+        # Remove the event, so it is accepted when Zoom delivers it again
+        logger.error("EolZoom - Error queuing event, inbox: {}, exception: {}".format(inbox, str(e)))
+        inbox.delete()
+        return HttpResponse(status=500)
+    return HttpResponse(status=200)
+
+
+def queue_event_inbox(inbox_id, event):
+    """
+        Queue the event processing, participant events are not processed in the high priority queue
+    """
+    queue = settings.EOLZOOM_EVENT_LOW_PRIORITY_QUEUE if event in LOW_PRIORITY_EVENTS else EVENT_QUEUE
+    process_event_inbox.apply_async(args=(inbox_id,), queue=queue)
+
+
+@task(
+    bind=True,
+    queue=EVENT_QUEUE,
+    default_retry_delay=EVENT_DEFAULT_RETRY_DELAY,
+    max_retries=EVENT_MAX_RETRIES)
+def process_event_inbox(self, inbox_id):
+    """
+        Process a saved zoom event with its handler and update its status.
+        Unexpected errors are retried (the event stays pending), events that
+        keep failing are re-queued by requeue_event_inbox
+    """
+    inbox = EolZoomEventInbox.objects.get(id=inbox_id)
+    if inbox.status != EolZoomEventInbox.PENDING:
+        logger.info("EolZoom - Event already processed, inbox: {}".format(inbox))
+        return False
+    inbox.attempts += 1
+    inbox.save(update_fields=['attempts'])
+    try:
+        event = parse_zoom_event(inbox.payload)
+        handler = get_event_handler(event)
+        if handler is None:
+            logger.error("EolZoom - Event without handler, inbox: {}".format(inbox))
+            success = False
+        else:
+            success = handler(event, inbox)
+    except InvalidZoomEvent as e:
+        logger.error("EolZoom - Invalid event, inbox: {}, exception: {}".format(inbox, str(e)))
+        success = False
+    except Exception as e:
+        logger.error("EolZoom - Error processing event, inbox: {}, exception: {}".format(inbox, str(e)))
+        if not self.request.called_directly and self.request.retries < self.max_retries:
+            raise self.retry(exc=e)
+        success = False
+    inbox.status = EolZoomEventInbox.PROCESSED if success else EolZoomEventInbox.FAILED
+    inbox.processed_at = timezone.now()
+    inbox.save()
+    return success
+
+
+def requeue_event_inbox():
+    """
+        Queue again the events lost or failed (with less than EOLZOOM_EVENT_MAX_ATTEMPTS attempts):
+        PENDING events older than EOLZOOM_EVENT_STALE_TIMEOUT (.delay() failed or worker died)
+        and FAILED events. Return the queued events count
+    """
+    stale = timezone.now() - datetime.timedelta(seconds=settings.EOLZOOM_EVENT_STALE_TIMEOUT)
+    events = list(EolZoomEventInbox.objects.filter(
+        Q(status=EolZoomEventInbox.PENDING, created__lt=stale) | Q(status=EolZoomEventInbox.FAILED),
+        attempts__lt=settings.EOLZOOM_EVENT_MAX_ATTEMPTS).order_by('id').values_list('id', 'event'))
+    EolZoomEventInbox.objects.filter(
+        id__in=[inbox_id for inbox_id, event in events],
+        status=EolZoomEventInbox.FAILED).update(status=EolZoomEventInbox.PENDING, processed_at=None)
+    for inbox_id, event in events:
+        queue_event_inbox(inbox_id, event)
+    logger.info("EolZoom - Requeue events: {}".format(len(events)))
+    return len(events)
+
+
+def purge_event_inbox():
+    """
+        Delete processed events and failed events without attempts left
+        older than EOLZOOM_EVENT_RETENTION. Return the deleted events count
+    """
+    expired = timezone.now() - datetime.timedelta(seconds=settings.EOLZOOM_EVENT_RETENTION)
+    count, _ = EolZoomEventInbox.objects.filter(
+        Q(status=EolZoomEventInbox.PROCESSED) |
+        Q(status=EolZoomEventInbox.FAILED, attempts__gte=settings.EOLZOOM_EVENT_MAX_ATTEMPTS),
+        created__lt=expired).delete()
+    logger.info("EolZoom - Purge events: {}".format(count))
+    return count
+
+
+@register_event_handler('meeting.started')
+def meeting_started_event(event, inbox):
     """
         -Start a meeting with registrants (only hoster can do)
         -Start a meeting WITHOUT registrants
             It will send an email to all enrolled students and redirect the meeting host to Zoom
         -Start livestreams in youtube if youtube livestrem is enabled
+        Each step is recorded in the inbox when done, a retry of the event (or requeue)
+        only repeats the failed steps (students are not registered or notified twice)
     """
-    from .utils_youtube import check_event_zoom_params, start_live_youtube
-    if not check_event_zoom_params(request):
-        return HttpResponse(status=400)
-    data = json.loads(request.body.decode())
-    id_meet = data['payload']['object']['id']
-    if data['event'] == "meeting.started":
-        try:
-            access_token = None
-            user_model = EolZoomMappingUserMeet.objects.get(meeting_id=id_meet)
-            if user_model.usage_key is None:
-                logger.error("EolZoom - user_model(EolZoomMappingUserMeet) is not up to date, meeting_id: {}".format(id_meet))
-                return HttpResponse(status=400)
-            user = user_model.user
-            request.user = user_model.user
-            if user_model.restricted_access or user_model.is_enabled:
-                refresh_token = _get_refresh_token(user)
-                token = get_access_token(user, refresh_token)
-                if 'error' in token:
-                    logger.error("EolZoom - Error get_access_token {}, user: {}, meet_id: {}".format(token['error'],user, id_meet))
-                    return HttpResponse(status=400)
-                access_token = token['access_token']
+    from .utils_youtube import start_live_youtube
+    id_meet = event.meeting_id
+    try:
+        user_model = EolZoomMappingUserMeet.objects.get(meeting_id=id_meet)
+        if user_model.usage_key is None:
+            logger.error("EolZoom - user_model(EolZoomMappingUserMeet) is not up to date, meeting_id: {}".format(id_meet))
+            return False
+        user = user_model.user
+        if not inbox.is_step_done('live'):
+            set_meeting_live(id_meet, event.meeting_uuid or '')
+            inbox.set_step_done('live')
+        if not inbox.is_step_done('students'):
             try:
                 if user_model.restricted_access:
-                    start_meeting_event(request, user, id_meet, str(user_model.course_key), str(user_model.usage_key), access_token, user_model.email_notification)
+                    request = get_event_request(inbox, user)
+                    start_meeting_event(request, user, id_meet, str(user_model.course_key), str(user_model.usage_key), user_model.email_notification)
                 else:
                     start_public_meeting_event(user, str(user_model.usage_key), user_model.email_notification, id_meet)
             except Exception as e:
                 logger.error("EolZoom - Error in start_meeting_event or start_public_meeting_event, user_model {}, exception: {}".format(user_model, str(e)))
-                return HttpResponse(status=400)
-            if user_model.is_enabled:
-                response = start_live_youtube(user_model, access_token)
+                return False
+            inbox.set_step_done('students')
+        if user_model.is_enabled:
+            if not inbox.is_step_done('youtube'):
+                token = get_user_access_token(user)
+                if 'error' in token:
+                    logger.error("EolZoom - Error get_access_token {}, user: {}, meet_id: {}".format(token['error'],user, id_meet))
+                    return False
+                response = start_live_youtube(user_model, token['access_token'])
                 if response is None or response['live'] != 'ok':
-                    return HttpResponse(status=400)
-            else:
-                logger.info("User {} dont have enabled youtube livestream in Xblock, meeting_id: {}".format(user_model.user, user_model.meeting_id))
-            return HttpResponse(status=200)
-        except EolZoomMappingUserMeet.DoesNotExist:
-            logger.error("EolZoom - Dont exists mapping user-meeting, Meeting {}".format(id_meet))
-            return HttpResponse(status=400)
-    logger.error("EolZoom - Event is not Started, event: {}, id_meeting: {}".format(data['event'], id_meet))
-    return HttpResponse(status=400)
+                    return False
+                inbox.set_step_done('youtube')
+        else:
+            logger.info("User {} dont have enabled youtube livestream in Xblock, meeting_id: {}".format(user_model.user, user_model.meeting_id))
+        return True
+    except EolZoomMappingUserMeet.DoesNotExist:
+        logger.error("EolZoom - Dont exists mapping user-meeting, Meeting {}".format(id_meet))
+        return False
+
+
+def set_meeting_live(meeting_id, meeting_uuid=''):
+    """
+        Mark the meeting instance (meeting_uuid) as live.
+        Participants and attendance are counted from the participant events of the
+        instance already processed (events don't arrive in order)
+    """
+    with transaction.atomic():
+        user_model = EolZoomMappingUserMeet.objects.select_for_update().filter(meeting_id=meeting_id).first()
+        if user_model is not None:
+            participants = EolZoomParticipant.objects.filter(meeting_id=meeting_id, meeting_uuid=meeting_uuid)
+            user_model.is_live = True
+            user_model.meeting_uuid = meeting_uuid
+            user_model.started_at = timezone.now()
+            user_model.ended_at = None
+            user_model.participants_count = participants.filter(in_meeting=True).count()
+            user_model.attendance_count = participants.count()
+            user_model.save(update_fields=[
+                'is_live', 'meeting_uuid', 'started_at', 'ended_at', 'participants_count', 'attendance_count'])
+    set_cached_meeting_live(meeting_id, True)
+
+
+@register_event_handler('meeting.ended')
+def meeting_ended_event(event, inbox):
+    """
+        Mark the meeting as ended and complete the youtube livestream.
+        A late event of a previous instance (meeting uuid) doesn't end the current instance
+    """
+    from .utils_youtube import stop_live_youtube
+    try:
+        user_model = EolZoomMappingUserMeet.objects.get(meeting_id=event.meeting_id)
+    except EolZoomMappingUserMeet.DoesNotExist:
+        logger.error("EolZoom - Dont exists mapping user-meeting, Meeting {}".format(event.meeting_id))
+        return False
+    if event.meeting_uuid and user_model.meeting_uuid and event.meeting_uuid != user_model.meeting_uuid:
+        logger.info("EolZoom - Ended event of a previous meeting instance, Meeting {}, uuid: {}".format(event.meeting_id, event.meeting_uuid))
+        return True
+    user_model.is_live = False
+    user_model.ended_at = timezone.now()
+    user_model.participants_count = 0
+    user_model.save(update_fields=['is_live', 'ended_at', 'participants_count'])
+    set_cached_meeting_live(event.meeting_id, False)
+    if user_model.is_enabled:
+        stop_live_youtube(user_model)
+    return True
+
+
+@register_event_handler('meeting.participant_joined')
+def participant_joined_event(event, inbox):
+    """
+        Update participants and attendance (distinct participants) count of the meeting
+    """
+    return update_participant(event, True, event.participant.get('join_time') or '')
+
+
+@register_event_handler('meeting.participant_left')
+def participant_left_event(event, inbox):
+    """
+        Update participants count of the meeting
+    """
+    return update_participant(event, False, event.participant.get('leave_time') or '')
+
+
+def update_participant(event, in_meeting, event_time):
+    """
+        Save the participant status (EolZoomParticipant) and update the counts of the meeting
+        if the event is of its current instance. Events older than the last applied are ignored
+    """
+    meeting_uuid = event.meeting_uuid or ''
+    with transaction.atomic():
+        # Lock the meeting, counts of concurrent events are serialized
+        user_model = EolZoomMappingUserMeet.objects.select_for_update().filter(
+            meeting_id=event.meeting_id).first()
+        if user_model is None:
+            logger.error("EolZoom - Dont exists mapping user-meeting, Meeting {}".format(event.meeting_id))
+            return False
+        participant, created = EolZoomParticipant.objects.get_or_create(
+            meeting_id=event.meeting_id,
+            meeting_uuid=meeting_uuid,
+            participant_key=event.get_participant_key(),
+            defaults={'in_meeting': in_meeting, 'event_time': event_time})
+        was_in_meeting = False if created else participant.in_meeting
+        if not created and not (event_time and event_time < participant.event_time):
+            participant.in_meeting = in_meeting
+            participant.event_time = event_time or participant.event_time
+            participant.save(update_fields=['in_meeting', 'event_time'])
+        if user_model.meeting_uuid == meeting_uuid:
+            user_model.participants_count = max(
+                user_model.participants_count + participant.in_meeting - was_in_meeting, 0)
+            user_model.attendance_count += created
+            user_model.save(update_fields=['participants_count', 'attendance_count'])
+    return True
+
+
+@register_event_handler('recording.completed')
+def recording_completed_event(event, inbox):
+    """
+        Save the recording share url of the meeting
+    """
+    share_url = event.object.get('share_url') or ''
+    updated = EolZoomMappingUserMeet.objects.filter(meeting_id=event.meeting_id).update(
+        recording_url=share_url)
+    return updated > 0
+
+
+def get_event_request(inbox, user):
+    """
+        Request of the meeting host, used to submit the instructor task out of the webhook request
+    """
+    request = HttpRequest()
+    request.user = user
+    request.META['REMOTE_ADDR'] = inbox.remote_addr
+    request.META['SERVER_NAME'] = inbox.server_name
+    return request
 
-def start_meeting_event(request, user, meeting_id, course_id, block_id, access_token, email_notification):
+def start_meeting_event(request, user, meeting_id, course_id, block_id, email_notification):
     """
         Start a meeting with registrants (only hoster can do)
     """
+    # Students can wait for their join url until the registration ends
+    set_join_urls_pending(meeting_id, True)
     # Task register meeting users. If already running pass
     try:
         task_register_meeting_users(
@@ -471,7 +833,6 @@ def start_meeting_event(request, user, meeting_id, course_id, block_id, access_t
             meeting_id,
             course_id,
             block_id,
-            access_token,
             email_notification)
     except AlreadyRunningError:
         pass
@@ -515,12 +876,14 @@ def start_public_meeting_event(user, block_id, email_notification, meeting_id):
         usage_key = UsageKey.from_string(block_id)
         course_id = usage_key.course_key
         enrolled_students = get_students(user, text_type(course_id))
-        for student in enrolled_students:
-            meeting_start_email.delay(block_id, student.email)
+        _send_meeting_start_emails(
+            block_id, enrolled_students.values_list('email', flat=True))
 
-def task_register_meeting_users(request, user_meeting, meeting_id, course_id, block_id, access_token, email_notification):
+def task_register_meeting_users(request, user_meeting, meeting_id, course_id, block_id, email_notification, preregister=False):
     """
         Task Configurations
+        preregister: students are registered when the meeting is scheduled (not started)
+        The access token is not sent in task_input, the task gets it when it runs
     """
     course_key = CourseKey.from_string(course_id)
     task_type = 'EOL_ZOOM_REGISTER_MEETING_USERS'
@@ -530,9 +893,13 @@ def task_register_meeting_users(request, user_meeting, meeting_id, course_id, bl
         'meeting_id': meeting_id,
         'course_id': course_id,
         'block_id': block_id,
-        'access_token': access_token,
-        'email_notification': email_notification}
+        'email_notification': email_notification,
+        'register_mode': settings.EOLZOOM_REGISTER_MODE,
+        'preregister': preregister}
     task_key = meeting_id
+    if preregister:
+        # Don't block the task of meeting.started event
+        task_key = '{}_preregister'.format(meeting_id)
     return submit_task(
         request,
         task_type,
@@ -559,51 +926,203 @@ def register_meeting_users(
         task_input,
         action_name):
     """
-        Register enrolled students (using Threads) and approve
+        Register enrolled students and approve.
+        task_input['register_mode']: 'threads' (bounded pool of threads) or 'asyncio'
+    """
+    try:
+        return _register_meeting_users(course_id, task_input, action_name)
+    finally:
+        # Waiting students stop when the registration of the started meeting ends
+        if not task_input.get('preregister'):
+            set_join_urls_pending(task_input["meeting_id"], False)
+
+
+def _register_meeting_users(course_id, task_input, action_name):
+    """
+        Register students of the meeting (register_meeting_users)
     """
     user_meeting_id = task_input["user_meeting_id"]
     user_meeting = User.objects.get(id=user_meeting_id)
     meeting_id = task_input["meeting_id"]
     block_id = task_input["block_id"]
-    access_token = task_input["access_token"]
     email_notification = task_input["email_notification"]
-    enrolled_students = get_students(user_meeting, text_type(course_id))
-    threads = []
-    for i in range(0, len(enrolled_students), MAX_REGISTRANT_STATUS):
-        t = threading.Thread(target=meeting_registrant,
-                             args=(user_meeting,
-                                   meeting_id,
-                                   enrolled_students[i:i + MAX_REGISTRANT_STATUS],
-                                   access_token))
-        threads.append(t)
-        t.start()  # instantiate thread
-    for t in threads:
-        t.join()  # wait until threads has completed
-
-    # Get join url for all students and submit to model
-    registrants = get_join_url(
-        user_meeting,
-        meeting_id,
-        text_type(course_id),
-        access_token)
+    # The task can wait in queue or run for a long time, get a token that outlives it
+    token = get_user_access_token(user_meeting, settings.EOLZOOM_TASK_ACCESS_TOKEN_MIN_TTL)
+    if 'error' in token:
+        logger.error("EolZoom - Error get_access_token {}, user: {}, meet_id: {}".format(token['error'], user_meeting, meeting_id))
+        task_progress = TaskProgress(action_name, 0, time.time())
+        return task_progress.update_task_state(extra_meta={'step': 'Error get_access_token'})
+    access_token = token['access_token']
+    # Delta between registered students (preregistered or previous start) and enrollments
+    students = get_students(user_meeting, text_type(course_id))
+    registered_emails = set(EolZoomRegistrant.objects.filter(
+        meeting_id=meeting_id).values_list('email', flat=True))
+    enrolled_emails = set(students.values_list('email', flat=True))
+    new_emails = enrolled_emails - registered_emails
+    unenrolled_emails = registered_emails - enrolled_emails
+    # Streamed, only new students are registered
+    enrolled_students = (
+        student for student in iter_students(user_meeting, text_type(course_id))
+        if student.email in new_emails)
+    task_progress = TaskProgress(action_name, len(new_emails), time.time())
+    progress = partial(_update_register_progress, task_progress)
+    if task_input.get('register_mode') == 'asyncio':
+        from .async_registrant import register_students
+        register_students(user_meeting, meeting_id, enrolled_students, access_token, progress)
+    else:
+        _register_students_threads(user_meeting, meeting_id, enrolled_students, access_token, progress)
+    _cancel_registrants(user_meeting, meeting_id, unenrolled_emails, access_token)
+
+    # Get join url only if there are new students and submit them to model
+    registrants = []
+    if new_emails:
+        registrants = get_join_url(
+            user_meeting,
+            meeting_id,
+            text_type(course_id),
+            access_token)
+        registrants = [r for r in registrants if r['email'] not in registered_emails]
     _submit_join_url(registrants, meeting_id, block_id, email_notification)
+    if email_notification:
+        # Students registered before this start also receive the notification
+        _send_meeting_start_emails(block_id, registered_emails & enrolled_emails)
     logger.warning("Register Meeting Users Meeting: {}".format(meeting_id))
+    return task_progress.update_task_state(extra_meta={'step': 'Registered students'})
 
 
-def _submit_join_url(registrants, meeting_id, block_id, email_notification):
+def _register_students_threads(user_meeting, meeting_id, enrolled_students, access_token, progress):
+    """
+        Register students in chunks of MAX_REGISTRANT_STATUS with a bounded pool of threads
+        (at most two chunks per worker are waiting, enrolled_students can be an iterator)
+    """
+    max_workers = settings.EOLZOOM_REGISTRANT_WORKERS
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = {}
+        for students in _chunks(enrolled_students, MAX_REGISTRANT_STATUS):
+            future = executor.submit(
+                meeting_registrant,
+                user_meeting,
+                meeting_id,
+                students,
+                access_token)
+            futures[future] = len(students)
+            if len(futures) >= 2 * max_workers:
+                done, _ = wait(futures, return_when=FIRST_COMPLETED)
+                _report_register_progress(meeting_id, futures, done, progress)
+        _report_register_progress(meeting_id, futures, as_completed(futures), progress)
+
+
+def _report_register_progress(meeting_id, futures, done, progress):
+    """
+        Report finished chunks and remove them from futures
+        Progress is reported from the task thread (celery current task)
+    """
+    for future in done:
+        try:
+            registered = future.result()
+        except Exception as e:
+            logger.error("Error Meeting Registrant, meeting_id: {}, exception: {}".format(meeting_id, str(e)))
+            registered = False
+        progress(futures.pop(future), registered)
+
+
+def _chunks(iterable, size):
+    """
+        Split an iterable in lists of 'size' elements
+    """
+    iterator = iter(iterable)
+    chunk = list(islice(iterator, size))
+    while chunk:
+        yield chunk
+        chunk = list(islice(iterator, size))
+
+
+def _update_register_progress(task_progress, students_count, registered):
     """
-        Create EolZoomRegistrant with student join_url
+        Update instructor task progress with a registered chunk of students
     """
-    for student in registrants:
-        # get_or_create for duplicates
-        eol_zoom_registrants, created = EolZoomRegistrant.objects.get_or_create(
+    task_progress.attempted += students_count
+    if registered:
+        task_progress.succeeded += students_count
+    else:
+        task_progress.failed += students_count
+    task_progress.update_task_state(extra_meta={'step': 'Registering students'})
+
+
+def _cancel_registrants(user_meeting, meeting_id, emails, access_token):
+    """
+        Cancel registrants of students no longer enrolled and remove their join url
+    """
+    emails = sorted(emails)
+    for i in range(0, len(emails), MAX_REGISTRANT_STATUS):
+        chunk = emails[i:i + MAX_REGISTRANT_STATUS]
+        status = set_registrant_status(
+            meeting_id,
+            user_meeting,
+            [{'email': email} for email in chunk],
+            access_token,
+            action='cancel')
+        if 'error' in status:
+            continue
+        EolZoomRegistrant.objects.filter(
             meeting_id=meeting_id,
-            email=student['email'],
-            join_url=student['join_url']
-        )
-        # send_mail
-        if email_notification:
-            meeting_start_email.delay(block_id, student['email'])
+            email__in=chunk).delete()
+        delete_cached_join_urls(meeting_id, chunk)
+
+
+def _send_meeting_start_emails(block_id, emails):
+    """
+        Send the meeting start notification in chunks of EOLZOOM_EMAIL_CHUNK_SIZE emails.
+        Chunks are queued in EOLZOOM_EMAIL_QUEUE spaced EOLZOOM_EMAIL_CHUNK_INTERVAL seconds
+        so a large course doesn't flood the workers
+    """
+    emails = list(emails)
+    chunk_size = settings.EOLZOOM_EMAIL_CHUNK_SIZE
+    for n, i in enumerate(range(0, len(emails), chunk_size)):
+        meeting_start_emails.apply_async(
+            args=(block_id, emails[i:i + chunk_size]),
+            queue=settings.EOLZOOM_EMAIL_QUEUE,
+            countdown=n * settings.EOLZOOM_EMAIL_CHUNK_INTERVAL)
+
+
+def _submit_join_url(registrants, meeting_id, block_id, email_notification):
+    """
+        Create EolZoomRegistrant with student join_url (bulk insert, existing rows are kept)
+        Return inserted and existing rows count
+    """
+    join_urls = {student['email']: student['join_url'] for student in registrants}
+    emails = list(join_urls)
+    bulk_size = settings.EOLZOOM_REGISTRANT_BULK_SIZE
+    inserted = 0
+    with transaction.atomic():
+        for i in range(0, len(emails), bulk_size):
+            chunk = emails[i:i + bulk_size]
+            existing_emails = set(EolZoomRegistrant.objects.filter(
+                meeting_id=meeting_id,
+                email__in=chunk).values_list('email', flat=True))
+            new_registrants = [
+                EolZoomRegistrant(
+                    meeting_id=meeting_id,
+                    email=email,
+                    join_url=join_urls[email])
+                for email in chunk if email not in existing_emails]
+            # ignore_conflicts for duplicates created concurrently
+            EolZoomRegistrant.objects.bulk_create(
+                new_registrants, batch_size=bulk_size, ignore_conflicts=True)
+            if new_registrants:
+                # Rows dropped by ignore_conflicts are not counted as inserted
+                inserted += EolZoomRegistrant.objects.filter(
+                    meeting_id=meeting_id,
+                    email__in=chunk).count() - len(existing_emails)
+    set_cached_join_urls(meeting_id, join_urls)
+    if email_notification:
+        _send_meeting_start_emails(block_id, emails)
+    result = {
+        'inserted': inserted,
+        'existing': len(emails) - inserted
+    }
+    logger.info("EolZoom - Submit join url meeting: {}, {}".format(meeting_id, result))
+    return result
 
 
 def get_join_url(user_meeting, meeting_id, course_id, access_token):
@@ -624,8 +1143,11 @@ def get_join_url(user_meeting, meeting_id, course_id, access_token):
         }
         url = "https://api.zoom.us/v2/meetings/{}/registrants?{}".format(
             meeting_id, urllib.parse.urlencode(params))
-        r = requests.get(
+        r = zoom_request(
+            'GET',
             url,
+            category='medium',
+            account=user_meeting.id,
             headers=headers)
         if r.status_code != 200:
             logger.error('Get Join URL fail {}'.format(r.text))
@@ -649,17 +1171,112 @@ def get_student_join_url(request):
 
     user = request.user
     meeting_id = request.GET.get('meeting_id')
-    try:
-        registrant = EolZoomRegistrant.objects.get(
-            email=user.email, meeting_id=meeting_id)
-        return JsonResponse({'status': True, 'join_url': registrant.join_url})
-    except EolZoomRegistrant.DoesNotExist:
-        # IF USER IS NOT REGISTERED, CHECK IF THE MEETING HAS STARTED
-        registrants = EolZoomRegistrant.objects.filter(meeting_id=meeting_id)
-        if registrants.count() > 0:
-            return JsonResponse({'status': False, 'error_type': 'NOT_FOUND'})
-        else:
-            return JsonResponse({'status': False, 'error_type': 'NOT_STARTED'})
+    join_url = get_registrant_join_url(meeting_id, user.email)
+    if join_url is not None:
+        return JsonResponse({'status': True, 'join_url': join_url})
+    # IF USER IS NOT REGISTERED, CHECK IF THE MEETING HAS STARTED (live status from zoom events)
+    if is_meeting_live(meeting_id):
+        return JsonResponse({'status': False, 'error_type': 'NOT_FOUND'})
+    else:
+        return JsonResponse({'status': False, 'error_type': 'NOT_STARTED'})
+
+
+def wait_student_join_url(request):
+    """
+        Check the student join url while the meeting registration is running.
+        It answers right away (workers are not held), with PENDING the student polls again after retry_after seconds
+    """
+    # check method and params
+    if request.method != "GET":
+        return HttpResponse(status=400)
+    if 'meeting_id' not in request.GET:
+        return HttpResponse(status=400)
+
+    email = request.user.email
+    meeting_id = request.GET.get('meeting_id')
+    join_url = get_registrant_join_url(meeting_id, email)
+    if join_url is not None:
+        return JsonResponse({'status': True, 'join_url': join_url})
+    if not is_meeting_live(meeting_id):
+        return JsonResponse({'status': False, 'error_type': 'NOT_STARTED'})
+    if is_join_urls_pending(meeting_id):
+        return JsonResponse({
+            'status': False,
+            'error_type': 'PENDING',
+            'retry_after': settings.EOLZOOM_JOIN_URL_RETRY_AFTER})
+    return JsonResponse({'status': False, 'error_type': 'NOT_FOUND'})
+
+
+def set_join_urls_pending(meeting_id, pending):
+    """
+        Mark the registration of the started meeting as running (students can wait their join url)
+    """
+    cache_key = JOIN_URL_PENDING_CACHE_KEY.format(meeting_id)
+    if pending:
+        cache.set(cache_key, True, settings.EOLZOOM_JOIN_URL_PENDING_TIMEOUT)
+    else:
+        cache.delete(cache_key)
+
+
+def is_join_urls_pending(meeting_id):
+    """
+        Check if the registration of the started meeting is running
+    """
+    return cache.get(JOIN_URL_PENDING_CACHE_KEY.format(meeting_id), False)
+
+
+def get_registrant_join_url(meeting_id, email):
+    """
+        Get the student join url (read-through cache), None if student is not registered
+    """
+    cache_key = JOIN_URL_CACHE_KEY.format(meeting_id, email)
+    join_url = cache.get(cache_key)
+    if join_url is None:
+        join_url = EolZoomRegistrant.objects.filter(
+            email=email, meeting_id=meeting_id).values_list('join_url', flat=True).first()
+        if join_url is None:
+            return None
+        cache.set(cache_key, join_url, settings.EOLZOOM_JOIN_URL_CACHE_TIMEOUT)
+    return join_url
+
+
+def set_cached_join_urls(meeting_id, join_urls):
+    """
+        Warm the join url cache, join_urls: {email: join_url}
+    """
+    cache.set_many(
+        {JOIN_URL_CACHE_KEY.format(meeting_id, email): join_url for email, join_url in join_urls.items()},
+        settings.EOLZOOM_JOIN_URL_CACHE_TIMEOUT)
+
+
+def delete_cached_join_urls(meeting_id, emails):
+    """
+        Remove join urls of cancelled registrants from cache
+    """
+    cache.delete_many([JOIN_URL_CACHE_KEY.format(meeting_id, email) for email in emails])
+
+
+def is_meeting_live(meeting_id):
+    """
+        Check if the meeting has started (read-through cache)
+    """
+    cache_key = MEETING_LIVE_CACHE_KEY.format(meeting_id)
+    is_live = cache.get(cache_key)
+    if is_live is None:
+        is_live = EolZoomMappingUserMeet.objects.filter(
+            meeting_id=meeting_id, is_live=True).exists()
+        cache.set(cache_key, is_live, settings.EOLZOOM_MEETING_LIVE_CACHE_TIMEOUT)
+    return is_live
+
+
+def set_cached_meeting_live(meeting_id, is_live):
+    """
+        Update the meeting live status in cache
+    """
+    cache.set(
+        MEETING_LIVE_CACHE_KEY.format(meeting_id),
+        is_live,
+        settings.EOLZOOM_MEETING_LIVE_CACHE_TIMEOUT)
 
 
 def meeting_registrant(user_meeting, meeting_id, students, access_token):
@@ -667,14 +1284,9 @@ def meeting_registrant(user_meeting, meeting_id, students, access_token):
         Create meeting registrant for a set of students and approve it
     """
     students_registrant = []  # List of students registrant
-    platform_name = configuration_helpers.get_value(
-        'PLATFORM_NAME', settings.PLATFORM_NAME).encode('utf-8').upper()
+    platform_name = get_registrant_platform_name()
     for student in students:
-        # Student name at Zoom == 'profile_name'+' platform_name'
-        student_info = {
-            'email': student.email,
-            'first_name': student.profile.name if student.profile.name != '' else student.username,
-            'last_name': platform_name.decode('utf-8')}
+        student_info = get_registrant_info(student, platform_name)
         data = get_meeting_registrant(
             meeting_id, user_meeting, student_info, access_token)
         if 'registrant_id' in data and 'error' not in data:
@@ -691,6 +1303,26 @@ def meeting_registrant(user_meeting, meeting_id, students, access_token):
     return True
 
 
+def get_registrant_platform_name():
+    """
+        Platform name used as registrant last name
+    """
+    platform_name = configuration_helpers.get_value(
+        'PLATFORM_NAME', settings.PLATFORM_NAME).encode('utf-8').upper()
+    return platform_name.decode('utf-8')
+
+
+def get_registrant_info(student, platform_name):
+    """
+        Registrant data of a student
+        Student name at Zoom == 'profile_name'+' platform_name'
+    """
+    return {
+        'email': student.email,
+        'first_name': student.profile.name if student.profile.name != '' else student.username,
+        'last_name': platform_name}
+
+
 def get_students(user, course_id):
     """
         Get all students enrolled to course (without meeting host)
@@ -703,12 +1335,21 @@ def get_students(user, course_id):
     return students
 
 
+def iter_students(user, course_id):
+    """
+        Stream students enrolled to course (without meeting host) in chunks of
+        EOLZOOM_STUDENTS_CHUNK_SIZE, only with the registrant fields (email, username, profile name)
+    """
+    students = get_students(user, course_id).select_related('profile').only(
+        'email', 'username', 'profile__name')
+    return students.iterator(chunk_size=settings.EOLZOOM_STUDENTS_CHUNK_SIZE)
+
+
 def get_meeting_registrant(
         meeting_id,
         user,
         student,
-        access_token,
-        rate_limit=0):
+        access_token):
     """
         Create a meeting registrant (without approve) for specific student
     """
@@ -717,22 +1358,14 @@ def get_meeting_registrant(
         "Content-Type": "application/json"
     }
     url = "https://api.zoom.us/v2/meetings/{}/registrants".format(meeting_id)
-    r = requests.post(
+    r = zoom_request(
+        'POST',
         url,
+        category='registrants',
+        account=user.id,
         data=json.dumps(student),
         headers=headers)
     if r.status_code != 201:
-        if r.status_code == 429 and rate_limit < 10:
-            """
-                When exceed the rate limits allowed for an API request wait one second and retry (max 10 times)
-            """
-            rate_limit += 1
-            logger.warning(
-                "[{}] You have reached the maximum per-second rate limit for this API. Retry ({})".format(
-                    meeting_id, rate_limit))
-            time.sleep(1.)
-            return get_meeting_registrant(
-                meeting_id, user, student, access_token, rate_limit)
         logger.error('{} Registration fail {}'.format(r.status_code, r.text))
         return {
             'error': 'Registration fail'
@@ -745,41 +1378,33 @@ def set_registrant_status(
         user,
         registrants,
         access_token,
-        rate_limit=0):
+        action='approve'):
     """
-        Set registrant status to 'approve' for a list of student (registrants)
+        Set registrant status to 'approve' (or 'cancel') for a list of student (registrants)
     """
     headers = {
         "Authorization": "Bearer {}".format(access_token),
         "Content-Type": "application/json"
     }
     body = {
-        'action': 'approve',
+        'action': action,
         'registrants': registrants
     }
     url = "https://api.zoom.us/v2/meetings/{}/registrants/status".format(
         meeting_id)
-    r = requests.put(
+    r = zoom_request(
+        'PUT',
         url,
+        category='registrants',
+        account=user.id,
         data=json.dumps(body),
         headers=headers)
     if r.status_code != 204:
-        if r.status_code == 429 and rate_limit < 10:
-            """
-                When exceed the rate limits allowed for an API request wait one second and retry (max 10 times)
-            """
-            rate_limit += 1
-            logger.warning(
-                "[{}] You have reached the maximum per-second rate limit for this API. Retry ({})".format(
-                    meeting_id, rate_limit))
-            time.sleep(1.)
-            return set_registrant_status(
-                meeting_id, user, registrants, rate_limit)
         logger.error('Set registrant status fail {}'.format(r.status_code))
         return {
             'error': 'Set registrant status fail'
         }
-    return {'success': 'approved'}
+    return {'success': REGISTRANT_STATUS[action]}
 
 
 def create_start_url(meeting_id):
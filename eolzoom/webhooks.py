@@ -0,0 +1,122 @@
+# -*- coding: utf-8 -*-
+"""
+    Zoom webhook events: parsing, validation and handlers registry
+"""
+
+
+from collections import namedtuple
+import json
+
+import logging
+logger = logging.getLogger(__name__)
+
+# Registered handlers by event name, handler(event, inbox) return True if success
+EVENT_HANDLERS = {}
+
+
+class InvalidZoomEvent(ValueError):
+    """
+        The webhook body is not a valid Zoom event
+    """
+
+
+class ZoomEvent(namedtuple('ZoomEvent', ['event', 'meeting_id', 'meeting_uuid', 'event_ts', 'object', 'data'])):
+    """
+        Zoom webhook event
+        object: payload.object (meeting, participant or recording data)
+        data: all the parsed body
+    """
+    __slots__ = ()
+
+    @property
+    def participant(self):
+        """
+            Participant data of participant events (empty dict in other events)
+        """
+        participant = self.object.get('participant')
+        return participant if isinstance(participant, dict) else {}
+
+    def get_participant_key(self):
+        """
+            Key of the participant in participant events: zoom user id, email or participant user_id
+        """
+        participant = self.participant
+        return str(
+            participant.get('id') or
+            participant.get('email') or
+            participant.get('user_id') or
+            participant.get('user_name') or '')
+
+    def get_dedup_key(self):
+        """
+            Key of repeated deliveries: meeting uuid (or id and event_ts) and participant data if present.
+            None if the event can't be identified (no uuid nor event_ts)
+        """
+        if self.meeting_uuid:
+            key = self.meeting_uuid
+        elif self.event_ts is not None:
+            key = '{}:{}'.format(self.meeting_id, self.event_ts)
+        else:
+            return None
+        participant = self.participant
+        if participant:
+            key = '{}:{}:{}'.format(
+                key,
+                participant.get('user_id') or participant.get('id'),
+                participant.get('join_time') or participant.get('leave_time'))
+        return key
+
+
+def register_event_handler(event):
+    """
+        Decorator, register the function as the handler of the event
+    """
+    def decorator(handler):
+        EVENT_HANDLERS[event] = handler
+        return handler
+    return decorator
+
+
+def get_event_handler(event):
+    """
+        Get the handler of the event, None if the event isn't handled
+    """
+    return EVENT_HANDLERS.get(event.event)
+
+
+def parse_zoom_event(body):
+    """
+        Parse and validate the webhook body (bytes or str)
+        Schema: {'event': str, 'event_ts': int (optional), 'payload': {'object': {'id': str|int, 'uuid': str (optional)}}}
+    """
+    try:
+        if isinstance(body, bytes):
+            body = body.decode('utf-8')
+        data = json.loads(body)
+    except (UnicodeDecodeError, ValueError):
+        raise InvalidZoomEvent('Body is not a json')
+    if not isinstance(data, dict):
+        raise InvalidZoomEvent('Body is not a json object')
+    event = data.get('event')
+    if not isinstance(event, str) or event == '':
+        raise InvalidZoomEvent('Invalid event')
+    payload = data.get('payload')
+    if not isinstance(payload, dict) or not isinstance(payload.get('object'), dict):
+        raise InvalidZoomEvent('Invalid payload.object')
+    meeting = payload['object']
+    meeting_id = meeting.get('id')
+    if isinstance(meeting_id, bool) or not isinstance(meeting_id, (str, int)) or meeting_id == '':
+        raise InvalidZoomEvent('Invalid payload.object.id')
+    meeting_uuid = meeting.get('uuid')
+    if meeting_uuid is not None and not isinstance(meeting_uuid, str):
+        raise InvalidZoomEvent('Invalid payload.object.uuid')
+    event_ts = data.get('event_ts')
+    if event_ts is not None and (isinstance(event_ts, bool) or not isinstance(event_ts, int)):
+        raise InvalidZoomEvent('Invalid event_ts')
+    return ZoomEvent(
+        event=event,
+        meeting_id=str(meeting_id),
+        meeting_uuid=meeting_uuid,
+        event_ts=event_ts,
+        object=meeting,
+        data=data)
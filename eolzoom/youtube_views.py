@@ -191,7 +191,8 @@ def create_livebroadcast(request):
     status = utils_youtube.update_meeting_youtube(
         request.user,
         livebroadcast_data,
-        request.POST['meeting_id'])
+        request.POST['meeting_id'],
+        blocking=False)
     if status:
         save = utils_youtube.save_broadcast_id(request.POST['meeting_id'], livebroadcast_data['broadcast_id'])
         if save:
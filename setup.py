@@ -35,7 +35,8 @@ setup(
         "google-api-python-client==1.10.0",
         "google-auth<2.0dev,==1.25.0",
         "google-auth-httplib2==0.0.3",
-        "google-auth-oauthlib==0.4.6"],
+        "google-auth-oauthlib==0.4.6",
+        "aiohttp<4.0"],
     entry_points={
         'xblock.v1': [
             'eolzoom = eolzoom:EolZoomXBlock',